@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import httpx
+import main
+
+class AppTestCase(unittest.IsolatedAsyncioTestCase):
+    """Runs main.app in-process against the mock backend, with in-memory stores
+
+    Subclasses change settings through `config`, e.g. {"CALENDAR_SYNC_ENABLED": True};
+    with the mirror on, tests start once its first pass has finished
+    """
+
+    config = {}
+
+    async def asyncSetUp(self):
+        settings = {
+            "DEBUG_MODE": True,
+            "CALENDAR_SYNC_ENABLED": False,
+            "WARMUP_ON_START": False,
+            "LOCAL_EVENT_STORE_PATH": ":memory:",
+            "SYNC_STORE_PATH": "",
+            "ROOM_LOCK_BACKEND": "memory",
+            "TENANTS_CONFIG_PATH": os.path.join(tempfile.gettempdir(), "no-tenants.json"),
+            **self.config
+        }
+        patch = mock.patch.multiple(main.config, **settings)
+        patch.start()
+        self.addCleanup(patch.stop)
+        lifespan = main.lifespan(main.app)
+        await lifespan.__aenter__()
+        self.addAsyncCleanup(lifespan.__aexit__, None, None, None)
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test")
+        self.addAsyncCleanup(self.client.aclose)
+        if settings["CALENDAR_SYNC_ENABLED"]:
+            await self.tenant.calendar_sync.wait_synced()
+
+    @property
+    def tenant(self):
+        return main.tenants.get()
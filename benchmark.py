@@ -0,0 +1,256 @@
+"""Offline load test for the booking path
+
+Serves FakeLuma over real HTTP on localhost, points the app at it and drives
+/events/create, /events/{id}, /locations and the conflict checker at rising
+calendar sizes and concurrency. Nothing leaves the machine and no API key is needed.
+
+    python benchmark.py
+    python benchmark.py --sizes 1000 10000 --concurrency 1 16 64 --latency-ms 50 --error-rate 0.01
+    python benchmark.py --json before.json
+    python benchmark.py --baseline before.json   # after a change, show the deltas
+
+FakeLuma runs in a thread of the same process, so numbers are for comparing
+runs on one machine, not absolute capacity.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+import uvicorn
+
+from fake_luma import FakeLuma
+
+ROW_FORMAT = "{:<16} {:>7} {:>5} {:>9} {:>9} {:>9} {:>10}  {:<18} {}"
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, round(fraction * len(samples) + 0.5) - 1))
+    return samples[rank]
+
+def summarize(name: str, size: int, concurrency: int, latencies: List[float], elapsed: float,
+              statuses: Counter, upstream: Counter) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "scenario": name,
+        "size": size,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "upstream_calls": dict(sorted(upstream.items())),
+    }
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def serve_fake(fake: FakeLuma, port: int) -> uvicorn.Server:
+    """Run FakeLuma on localhost in a background thread"""
+    server = uvicorn.Server(uvicorn.Config(
+        fake.app, host="127.0.0.1", port=port, log_level="warning", access_log=False
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+def seed_fake(fake: FakeLuma, events) -> List[str]:
+    fake.events.clear()
+    fake.hosts.clear()
+    return [
+        fake.add_event(
+            event.name,
+            event.start_time.isoformat(),
+            event.end_time.isoformat(),
+            event.location,
+            api_id=event.event_id
+        )
+        for event in events
+    ]
+
+async def drive(total: int, concurrency: int, request: Callable[[int], Awaitable[int]]):
+    """Issue `total` requests from `concurrency` workers, timing each one"""
+    latencies, statuses = [], Counter()
+    remaining = iter(range(total))
+
+    async def worker():
+        for number in remaining:
+            started = time.perf_counter()
+            try:
+                status = await request(number)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[str(status)] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started, statuses
+
+def bench_conflict_checker(checker, events, candidates, size: int) -> List[dict]:
+    """Time find_conflicts against a plain list, the room index and packed columns"""
+    index = checker.build_index(events)
+    columns = checker.build_columns(events)
+    results = []
+    for name, existing in (("conflicts/list", events), ("conflicts/index", index), ("conflicts/columns", columns)):
+        latencies, hits = [], Counter()
+        started = time.perf_counter()
+        for candidate in candidates:
+            call_started = time.perf_counter()
+            conflicted = bool(checker.find_conflicts(candidate, existing))
+            latencies.append(time.perf_counter() - call_started)
+            hits["conflict" if conflicted else "free"] += 1
+        results.append(summarize(name, size, 1, latencies, time.perf_counter() - started, hits, Counter()))
+    return results
+
+async def run(args, fake: FakeLuma) -> List[dict]:
+    # The app reads its configuration at import time, so import it only once the fake is up
+    import main
+    from services.event_store import generate_synthetic_events
+
+    rng = random.Random(args.seed)
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    # Unhandled errors come back as the 500s a real client would see
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    results = []
+
+    async with main.lifespan(main.app), httpx.AsyncClient(transport=transport, base_url="http://app") as app:
+        # Requests without a tenant go to the default one
+        tenant = main.tenants.get()
+        rooms = [room.name for room in tenant.room_registry.rooms]
+        for size in args.sizes:
+            events = generate_synthetic_events(tenant.room_registry, size, today, args.days, seed=args.seed)
+            event_ids = seed_fake(fake, events)
+            candidates = generate_synthetic_events(
+                tenant.room_registry, args.requests, today, args.days, seed=args.seed + 1
+            )
+            results.extend(bench_conflict_checker(tenant.conflict_checker, events, candidates, size))
+
+            for concurrency in args.concurrency:
+                # Every run starts cold: empty cache, and a fresh mirror when sync is on
+                tenant.luma_client.invalidate()
+                if tenant.calendar_sync.enabled:
+                    await tenant.calendar_sync.sync_once()
+
+                async def locations(number):
+                    return (await app.get("/locations")).status_code
+
+                async def get_event(number):
+                    return (await app.get(f"/events/{rng.choice(event_ids)}")).status_code
+
+                async def create_event(number):
+                    start = today + timedelta(
+                        days=rng.randrange(args.days), hours=rng.randrange(8, 22), minutes=rng.choice((0, 30))
+                    )
+                    response = await app.post("/events/create", json={
+                        "name": f"Benchmark {size}/{concurrency}/{number}",
+                        "start_time": start.isoformat(),
+                        "end_time": (start + timedelta(hours=1)).isoformat(),
+                        "location": rng.choice(rooms),
+                        "host_email": "bench@example.com"
+                    })
+                    return response.status_code
+
+                scenarios = (("locations", locations), ("events/get", get_event), ("events/create", create_event))
+                for name, request in scenarios:
+                    calls_before = Counter(fake.calls)
+                    latencies, elapsed, statuses = await drive(args.requests, concurrency, request)
+                    upstream = Counter(fake.calls)
+                    upstream.subtract(calls_before)
+                    results.append(summarize(
+                        name, size, concurrency, latencies, elapsed, statuses, +upstream
+                    ))
+    return results
+
+def _key(row: dict):
+    return row["scenario"], row["size"], row["concurrency"]
+
+def _delta(now: float, before: float) -> str:
+    return f"{(now - before) / before:+.0%}" if before else "n/a"
+
+def report(results: List[dict], baseline: Dict[tuple, dict]) -> None:
+    print(ROW_FORMAT.format("scenario", "size", "conc", "p50 ms", "p95 ms", "p99 ms", "req/s", "statuses", "upstream"))
+    for row in results:
+        upstream = " ".join(
+            f"{endpoint.split('/')[-1]}={count}" for endpoint, count in row["upstream_calls"].items()
+        )
+        print(ROW_FORMAT.format(
+            row["scenario"], row["size"], row["concurrency"],
+            f"{row['p50_ms']:.2f}", f"{row['p95_ms']:.2f}", f"{row['p99_ms']:.2f}",
+            f"{row['throughput_rps']:.1f}",
+            " ".join(f"{status}:{count}" for status, count in row["statuses"].items()),
+            upstream or "-"
+        ))
+        before = baseline.get(_key(row))
+        if before:
+            print(f"{'':<16} vs baseline: p95 {_delta(row['p95_ms'], before['p95_ms'])}, "
+                  f"throughput {_delta(row['throughput_rps'], before['throughput_rps'])}, "
+                  f"upstream calls {sum(before['upstream_calls'].values())} -> {sum(row['upstream_calls'].values())}")
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the booking path against a fake Luma")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000],
+                        help="events in the fake calendar")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--days", type=int, default=30, help="days the calendar is spread over")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="fake Luma latency per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of fake Luma calls answered 503")
+    parser.add_argument("--page-size", type=int, default=50, help="fake Luma list-events page size")
+    parser.add_argument("--no-sync", action="store_true", help="benchmark without the calendar mirror")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against results written earlier with --json")
+    args = parser.parse_args()
+
+    fake = FakeLuma(
+        page_size=args.page_size,
+        latency_seconds=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        api_key="benchmark",
+        seed=args.seed
+    )
+    port = _free_port()
+    server = serve_fake(fake, port)
+
+    os.environ.update({
+        "LUMA_API_KEY": "benchmark",
+        "LUMA_API_BASE_URL": f"http://127.0.0.1:{port}",
+        "DEBUG_MODE": "false",
+        "CALENDAR_SYNC_ENABLED": "false" if args.no_sync else "true",
+        "SYNC_WINDOW_DAYS": str(args.days),
+        "SYNC_STORE_PATH": "",
+    })
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    try:
+        results = asyncio.run(run(args, fake))
+    finally:
+        server.should_exit = True
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {_key(row): row for row in json.load(f)["results"]}
+    report(results, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,15 +1,73 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+@lru_cache(maxsize=None)
+def _load_dotenv() -> None:
+    # Load environment variables from .env file, once, the first time settings are read
+    load_dotenv()
 
 class Config:
     def __init__(self):
+        _load_dotenv()
         self.API_KEY = os.getenv('LUMA_API_KEY')
         self.BASE_URL = os.getenv('LUMA_API_BASE_URL', 'https://api.lu.ma/public/v1')
         self.DEBUG_MODE = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
+        # SQLite file behind MockLumaClient in debug mode; ":memory:" keeps nothing
+        self.LOCAL_EVENT_STORE_PATH = os.getenv('LOCAL_EVENT_STORE_PATH', 'local_events.db')
+        self.LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+        self.LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+        self.ROOMS_PATH = os.getenv(
+            'ROOMS_CONFIG_PATH',
+            os.path.join(os.path.dirname(__file__), 'config', 'rooms.json')
+        )
         self.DEFAULT_BUFFER_MINUTES = int(os.getenv('DEFAULT_BUFFER_MINUTES', '0'))
+        self.EVENT_CACHE_TTL_SECONDS = int(os.getenv('EVENT_CACHE_TTL_SECONDS', '60'))
+        self.EVENT_CACHE_MAX_DAYS = int(os.getenv('EVENT_CACHE_MAX_DAYS', '128'))
+        self.EVENT_CACHE_MAX_EVENTS = int(os.getenv('EVENT_CACHE_MAX_EVENTS', '2048'))
+        self.LUMA_POOL_SIZE = int(os.getenv('LUMA_POOL_SIZE', '10'))
+        self.LUMA_TIMEOUT_SECONDS = float(os.getenv('LUMA_TIMEOUT_SECONDS', '10'))
+        self.LUMA_CONNECT_TIMEOUT_SECONDS = float(os.getenv('LUMA_CONNECT_TIMEOUT_SECONDS', '5'))
+        # Per-endpoint overrides, e.g. "calendar/list-events=20,event/create=15"
+        self.LUMA_ENDPOINT_TIMEOUTS = {
+            endpoint.strip(): float(seconds)
+            for endpoint, seconds in (
+                item.split('=') for item in os.getenv('LUMA_ENDPOINT_TIMEOUTS', '').split(',') if item
+            )
+        }
+        self.LUMA_MAX_RETRIES = int(os.getenv('LUMA_MAX_RETRIES', '3'))
+        self.LUMA_RETRY_BASE_SECONDS = float(os.getenv('LUMA_RETRY_BASE_SECONDS', '0.25'))
+        self.LUMA_RETRY_MAX_SECONDS = float(os.getenv('LUMA_RETRY_MAX_SECONDS', '5'))
+        self.LUMA_BREAKER_THRESHOLD = int(os.getenv('LUMA_BREAKER_THRESHOLD', '5'))
+        self.LUMA_BREAKER_RESET_SECONDS = float(os.getenv('LUMA_BREAKER_RESET_SECONDS', '30'))
+        self.LUMA_HOST_FANOUT = int(os.getenv('LUMA_HOST_FANOUT', '4'))
+        self.BATCH_MAX_EVENTS = int(os.getenv('BATCH_MAX_EVENTS', '50'))
+        self.BATCH_CREATE_CONCURRENCY = int(os.getenv('BATCH_CREATE_CONCURRENCY', '4'))
+        self.ROOM_LOCK_BACKEND = os.getenv('ROOM_LOCK_BACKEND', 'memory').lower()
+        self.ROOM_LOCK_PATH = os.getenv('ROOM_LOCK_PATH', 'room_locks.db')
+        self.ROOM_LOCK_LEASE_SECONDS = float(os.getenv('ROOM_LOCK_LEASE_SECONDS', '60'))
+        self.ROOM_LOCK_TIMEOUT_SECONDS = float(os.getenv('ROOM_LOCK_TIMEOUT_SECONDS', '15'))
+        self.IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', '86400'))
+        self.IDEMPOTENCY_MAX_KEYS = int(os.getenv('IDEMPOTENCY_MAX_KEYS', '10000'))
+        self.AVAILABILITY_MAX_DAYS = int(os.getenv('AVAILABILITY_MAX_DAYS', '31'))
+        self.SCHEDULE_FEED_DEFAULT_DAYS = int(os.getenv('SCHEDULE_FEED_DEFAULT_DAYS', '14'))
+        self.SCHEDULE_FEED_MAX_DAYS = int(os.getenv('SCHEDULE_FEED_MAX_DAYS', '366'))
+        self.CALENDAR_SYNC_ENABLED = os.getenv('CALENDAR_SYNC_ENABLED', 'true').lower() == 'true'
+        self.SYNC_WINDOW_DAYS = int(os.getenv('SYNC_WINDOW_DAYS', '60'))
+        self.SYNC_INTERVAL_SECONDS = int(os.getenv('SYNC_INTERVAL_SECONDS', '60'))
+        # Optional SQLite file that keeps a durable copy of the synced window
+        self.SYNC_STORE_PATH = os.getenv('SYNC_STORE_PATH', '')
+        # Tenant served when a request doesn't name one; the others live in tenants.json
+        self.DEFAULT_TENANT = os.getenv('DEFAULT_TENANT', 'default')
+        self.TENANTS_CONFIG_PATH = os.getenv(
+            'TENANTS_CONFIG_PATH',
+            os.path.join(os.path.dirname(__file__), 'config', 'tenants.json')
+        )
+        self.TENANT_IDLE_SECONDS = int(os.getenv('TENANT_IDLE_SECONDS', '900'))
+        self.TENANT_MAX_ACTIVE = int(os.getenv('TENANT_MAX_ACTIVE', '32'))
+        # Prime the default tenant before /health reports ready
+        self.WARMUP_ON_START = os.getenv('WARMUP_ON_START', 'false').lower() == 'true'
+        self.WARMUP_TIMEOUT_SECONDS = float(os.getenv('WARMUP_TIMEOUT_SECONDS', '20'))
     
     def is_luma_configured(self) -> bool:
         """Check if Luma API is configured"""
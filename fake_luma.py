@@ -0,0 +1,139 @@
+import asyncio
+import random
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+class FakeLuma:
+    """Local stand-in for the Luma public API, used by tests and benchmarks
+
+    Serve it in-process with httpx.ASGITransport(app=fake.app), or for real with
+    uvicorn fake_luma:app --port 8100
+    """
+
+    def __init__(
+        self,
+        page_size: int = 50,
+        latency_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        api_key: Optional[str] = None,
+        seed: Optional[int] = None
+    ):
+        self.page_size = page_size
+        self.latency_seconds = latency_seconds
+        self.error_rate = error_rate
+        self.api_key = api_key
+        self.random = random.Random(seed)
+        self.events = {}
+        self.hosts = {}
+        self.calls = Counter()
+        self._scripted_failures = {}
+        self._next_id = 1
+        self.app = self._build_app()
+
+    def add_event(self, name: str, start_at: str, end_at: str, room: str, api_id: str = None) -> str:
+        """Store an event the way Luma would return it, with the room after the '+'"""
+        api_id = api_id or self._new_id()
+        self.events[api_id] = {
+            "api_id": api_id,
+            "name": name,
+            "start_at": start_at,
+            "end_at": end_at,
+            "url": f"https://lu.ma/{api_id}",
+            "geo_address_json": {"type": "manual", "address": f"540 Laguna St, San Francisco + {room}"}
+        }
+        return api_id
+
+    def fail_next(self, endpoint: str, status: int, times: int = 1, retry_after: str = None) -> None:
+        """Answer the next `times` calls to an endpoint with an error status"""
+        self._scripted_failures.setdefault(endpoint, []).extend([(status, retry_after)] * times)
+
+    def _new_id(self) -> str:
+        api_id = f"evt-fake{self._next_id}"
+        self._next_id += 1
+        return api_id
+
+    async def _preamble(self, request: Request, endpoint: str) -> Optional[JSONResponse]:
+        """Shared latency, auth and failure injection for every endpoint"""
+        self.calls[endpoint] += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if self.api_key and request.headers.get("x-luma-api-key") != self.api_key:
+            return JSONResponse({"message": "Invalid API key"}, status_code=401)
+        scripted = self._scripted_failures.get(endpoint)
+        if scripted:
+            status, retry_after = scripted.pop(0)
+            headers = {"Retry-After": retry_after} if retry_after is not None else None
+            return JSONResponse({"message": "scripted failure"}, status_code=status, headers=headers)
+        if self.error_rate and self.random.random() < self.error_rate:
+            return JSONResponse({"message": "random failure"}, status_code=503)
+        return None
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/calendar/list-events")
+        async def list_events(request: Request):
+            if failure := await self._preamble(request, "calendar/list-events"):
+                return failure
+            params = request.query_params
+            after = _parse_time(params["after"]) if "after" in params else None
+            before = _parse_time(params["before"]) if "before" in params else None
+            limit = min(int(params.get("pagination_limit", self.page_size)), self.page_size)
+            offset = int(params.get("pagination_cursor") or 0)
+
+            matching = sorted(
+                (
+                    event for event in self.events.values()
+                    if (after is None or _parse_time(event["start_at"]) >= after)
+                    and (before is None or _parse_time(event["start_at"]) < before)
+                ),
+                key=lambda event: event["start_at"]
+            )
+            page = matching[offset:offset + limit]
+            has_more = offset + limit < len(matching)
+            return {
+                "entries": [{"api_id": event["api_id"], "event": event} for event in page],
+                "has_more": has_more,
+                "next_cursor": str(offset + limit) if has_more else None
+            }
+
+        @app.post("/event/create")
+        async def create_event(request: Request):
+            if failure := await self._preamble(request, "event/create"):
+                return failure
+            payload = await request.json()
+            address = payload["geo_address_json"]["address"]
+            api_id = self.add_event(
+                payload["name"], payload["start_at"], payload["end_at"],
+                address.split("+")[1].strip() if "+" in address else address
+            )
+            return {"api_id": api_id}
+
+        @app.post("/event/add-host")
+        async def add_host(request: Request):
+            if failure := await self._preamble(request, "event/add-host"):
+                return failure
+            payload = await request.json()
+            if payload["event_api_id"] not in self.events:
+                return JSONResponse({"message": "Event not found"}, status_code=404)
+            self.hosts.setdefault(payload["event_api_id"], []).append(payload["email"])
+            return {}
+
+        @app.get("/event/get")
+        async def get_event(request: Request):
+            if failure := await self._preamble(request, "event/get"):
+                return failure
+            event = self.events.get(request.query_params.get("api_id"))
+            if event is None:
+                return JSONResponse({"message": "Event not found"}, status_code=404)
+            return {"event": event}
+
+        return app
+
+app = FakeLuma().app
@@ -1,33 +1,99 @@
-import os
+from services.startup import LOCAL_TIMEZONE, WarmUp, local_day_start, profile as startup_profile
+import asyncio
+import hashlib
 import json
+import os
+import time
+import httpx
+from contextlib import asynccontextmanager
+from email.utils import format_datetime, parsedate_to_datetime
 from datetime import datetime, timedelta, timezone
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
 from pydantic import BaseModel
-from typing import Optional, List
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from typing import AsyncIterator, Optional, List
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 
 from config import Config
 from models.event import Event
-from services.luma_client import LumaClient
-from services.conflict_checker import ConflictChecker
-from services.mock_luma_client import MockLumaClient
+from services.log import configure_logging
+from services import metrics
+from services.resilience import CircuitOpenError
+from services.availability import room_availability
+from services.idempotency import IdempotencyKeyReused, IdempotencyStore
+from services.room_locks import RoomLockTimeout
+from services.tenants import Tenant, TenantPool
+from services.static_assets import IMMUTABLE, Asset, StaticAssets
+from services.schedule_feed import content_etag, ics_chunks, jsonl_chunks, room_events
+
+startup_profile.mark("imports")
 
-app = FastAPI()
-app.mount("/static", StaticFiles(directory="static"), name="static")
 config = Config()
+configure_logging(config)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+# Built by the lifespan below, so importing this module stays cheap
+tenants: TenantPool = None
+idempotency_store: IdempotencyStore = None
+static_assets: StaticAssets = None
+warm_up: WarmUp = None
 
-# Load rooms configuration
-with open(os.path.join(os.path.dirname(__file__), 'config', 'rooms.json')) as f:
-    rooms_config = json.load(f)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global tenants, idempotency_store, static_assets, warm_up
 
-# Use mock client in debug mode
-if config.DEBUG_MODE:
-    luma_client = MockLumaClient()
-else:
-    luma_client = LumaClient(config)
+    # Each community space gets its own rooms, Luma client, caches and locks, built on first use
+    with startup_profile.phase("tenants"):
+        tenants = TenantPool(config)
+        # Catch rooms.json mistakes now rather than on some tenant's first booking
+        tenants.check_rooms()
+    idempotency_store = IdempotencyStore(config)
+    # Hashed, precompressed copies of static/, built once per worker
+    with startup_profile.phase("static_assets"):
+        static_assets = StaticAssets(STATIC_DIR)
+    startup_profile.mark("ready_to_serve")
+
+    tenants.start()
+    warm_up = WarmUp(config.WARMUP_ON_START, config.WARMUP_TIMEOUT_SECONDS)
+    warm_up.start(tenants)
+    if not warm_up.enabled:
+        startup_profile.log()
+    yield
+    await warm_up.stop()
+    # Stops every tenant's sync and releases its pooled upstream connections
+    await tenants.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+metrics.registry.gauge(
+    "event_cache_hit_ratio", "Share of day lookups served from the event cache",
+    lambda: [({"tenant": tenant.id}, tenant.luma_client.stats()["hit_rate"]) for tenant in tenants or ()]
+)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template so /events/{event_id} doesn't explode into one series per id
+    route = request.scope.get("route")
+    metrics.observe_request(
+        route.path if route else "unmatched",
+        request.method,
+        response.status_code,
+        time.perf_counter() - started
+    )
+    return response
 
-conflict_checker = ConflictChecker(config)
+async def current_tenant(
+    x_tenant: Optional[str] = Header(None),
+    tenant: Optional[str] = Query(None)
+) -> AsyncIterator[Tenant]:
+    """The tenant named by the X-Tenant header or ?tenant=, else the default one"""
+    tenant_id = x_tenant or tenant
+    if tenant_id and tenant_id not in tenants.configs:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant: {tenant_id}")
+    async with tenants.use(tenant_id) as current:
+        yield current
 
 class EventRequest(BaseModel):
     name: str
@@ -37,84 +103,371 @@ class EventRequest(BaseModel):
     host_email: str
     additional_hosts: Optional[List[str]] = None
 
-@app.post("/events/create")
-async def create_event(event_request: EventRequest):
-    # Create Event object
-    new_event = Event(
+class BatchEventRequest(BaseModel):
+    events: List[EventRequest]
+
+def _new_event(event_request: EventRequest) -> Event:
+    return Event(
         name=event_request.name,
-        start_time=event_request.start_time,
-        end_time=event_request.end_time,
+        start_time=_localize(event_request.start_time),
+        end_time=_localize(event_request.end_time),
         location=event_request.location,
         host_email=event_request.host_email,
         additional_hosts=event_request.additional_hosts
     )
+
+def _day_start(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _localize(moment: datetime) -> datetime:
+    """Read dates and times given without an offset as the space's local time"""
+    return LOCAL_TIMEZONE.localize(moment) if moment.tzinfo is None else moment
+
+def _room_id(tenant: Tenant, location: str) -> Optional[str]:
+    """Registry id for a requested location, None for names outside rooms.json"""
+    room = tenant.room_registry.by_name.get(location)
+    return room.id if room else None
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match names this ETag, weak or strong, or is a wildcard"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def _asset_response(request: Request, asset: Asset, cache_control: str) -> Response:
+    """Serve the best encoding the client accepts, or a 304 if it already has this content"""
+    encoding = StaticAssets.negotiate(asset, request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": StaticAssets.etag(asset, encoding),
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding"
+    }
+    # Any encoding of the same content is still current
+    if any(_etag_matches(request, StaticAssets.etag(asset, coding)) for coding in asset.bodies):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=asset.bodies[encoding], media_type=asset.content_type, headers=headers)
+
+def _conflicts_payload(events: List[Event]) -> List[dict]:
+    return [{
+        "name": event.name,
+        "start_time": event.start_time.isoformat(),
+        "end_time": event.end_time.isoformat(),
+        "location": event.location
+    } for event in events]
+
+@app.post("/events/create")
+async def create_event(
+    event_request: EventRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+    tenant: Tenant = Depends(current_tenant)
+):
+    if not idempotency_key:
+        return await _create_event(tenant, event_request)
+
+    # Double clicks and client retries with the same key get the first outcome back
+    try:
+        result, replayed = await idempotency_store.run(
+            f"{tenant.id}:{idempotency_key}",
+            event_request.model_dump_json(),
+            lambda: _create_event(tenant, event_request)
+        )
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+async def _create_event(tenant: Tenant, event_request: EventRequest) -> dict:
+    # Create Event object
+    new_event = _new_event(event_request)
     
-    # Get existing events for the day
-    day_start = new_event.start_time.replace(hour=0, minute=0, second=0)
-    day_end = day_start + timedelta(days=1)
-    existing_events = luma_client.get_events(day_start, day_end)
-    
-    # Check for conflicts
-    if conflict_checker.has_conflict(new_event, existing_events):
-        # Find conflicting events
-        conflicting_events = [
-            event for event in existing_events 
-            if conflict_checker._events_overlap(
-                new_event.start_time, new_event.end_time,
-                event.start_time, event.end_time
-            )
-        ]
+    # Hold the room and every room it conflicts with from the check until the event exists
+    async with tenant.room_locks.hold([new_event.location]):
+        # Get existing events for the day
+        day_start = _day_start(new_event.start_time)
+        day_end = day_start + timedelta(days=1)
+        schedule = await _locked_schedule(tenant, day_start, day_end)
         
-        # Format conflicts for response
-        conflicts_data = [{
-            "name": event.name,
-            "start_time": event.start_time.isoformat(),
-            "end_time": event.end_time.isoformat(),
-            "location": event.location
-        } for event in conflicting_events]
+        # Check for conflicts, collecting the conflicting events in the same pass
+        conflicting_events = tenant.conflict_checker.find_conflicts(new_event, schedule)
+        metrics.observe_booking(_room_id(tenant, new_event.location), conflicted=bool(conflicting_events))
+        if conflicting_events:
+            raise HTTPException(
+                status_code=409,
+                detail="Event conflicts with existing events",
+                headers={
+                    "X-Error-Type": "conflict",
+                    "X-Conflicts": json.dumps(_conflicts_payload(conflicting_events))
+                },
+            ) from None
         
+        # Create event if no conflicts
+        event_id = await tenant.luma_client.create_event(new_event)
+        tenant.calendar_sync.record(new_event)
+    return {
+        "event_id": event_id,
+        "message": "Event created successfully",
+        "hosts": new_event.host_results or []
+    }
+
+async def _locked_schedule(tenant: Tenant, day_start: datetime, day_end: datetime):
+    """Schedule to check against while holding room locks"""
+    if tenant.room_locks.shared:
+        # Another worker may have booked since our cached copy, or a fetch already in flight, started
+        return await tenant.luma_client.refresh_schedule(day_start, day_end)
+    return await tenant.calendar_sync.get_schedule(day_start, day_end)
+
+@app.post("/events/batch")
+async def create_events_batch(batch: BatchEventRequest, tenant: Tenant = Depends(current_tenant)):
+    """Check many events in one sweep and create the ones that fit"""
+    if len(batch.events) > config.BATCH_MAX_EVENTS:
         raise HTTPException(
-            status_code=409,
-            detail="Event conflicts with existing events",
-            headers={
-                "X-Error-Type": "conflict",
-                "X-Conflicts": json.dumps(conflicts_data)
-            },
-        ) from None
-    
-    # Create event if no conflicts
-    event_id = luma_client.create_event(new_event)
-    return {"event_id": event_id, "message": "Event created successfully"}
+            status_code=400,
+            detail=f"A batch can hold at most {config.BATCH_MAX_EVENTS} events"
+        )
+    new_events = [_new_event(event_request) for event_request in batch.events]
 
-@app.get("/")
-async def read_root():
-    return FileResponse("static/index.html")
+    # Hold every room in the batch until all of its events exist
+    async with tenant.room_locks.hold({event.location for event in new_events}):
+        # Fetch every affected day once, whatever the number of events on it
+        days = sorted({_day_start(event.start_time) for event in new_events})
+        schedules = dict(zip(days, await asyncio.gather(*(
+            _locked_schedule(tenant, day, day + timedelta(days=1)) for day in days
+        ))))
+
+        # Each item is checked against its day's schedule as it is, and against the items
+        # accepted before it, which go in a small index of their own
+        checker = tenant.conflict_checker
+        batch_index = checker.build_index([])
+        results = []
+        accepted = []
+        for position, new_event in enumerate(new_events):
+            conflicting_events = sorted(
+                checker.find_conflicts(new_event, schedules[_day_start(new_event.start_time)])
+                + checker.find_conflicts(new_event, batch_index),
+                key=lambda event: event.start_time
+            )
+            metrics.observe_booking(_room_id(tenant, new_event.location), conflicted=bool(conflicting_events))
+            if conflicting_events:
+                results.append({
+                    "index": position,
+                    "status": "conflict",
+                    "conflicts": _conflicts_payload(conflicting_events)
+                })
+            else:
+                batch_index.add(new_event)
+                accepted.append(position)
+                results.append({"index": position, "status": "accepted"})
+
+        semaphore = asyncio.Semaphore(config.BATCH_CREATE_CONCURRENCY)
+
+        async def create(position: int) -> None:
+            new_event = new_events[position]
+            async with semaphore:
+                try:
+                    event_id = await tenant.luma_client.create_event(new_event)
+                except Exception as e:
+                    results[position] = {"index": position, "status": "failed", "error": str(e)}
+                    return
+            tenant.calendar_sync.record(new_event)
+            results[position] = {
+                "index": position,
+                "status": "created",
+                "event_id": event_id,
+                "hosts": new_event.host_results or []
+            }
+
+        await asyncio.gather(*(create(position) for position in accepted))
+    return {
+        "created": sum(result["status"] == "created" for result in results),
+        "results": results
+    }
+
+@app.api_route("/", methods=["GET", "HEAD"])
+async def read_root(request: Request):
+    # The page URL never changes, so it is revalidated; what it links to is cached for good
+    return _asset_response(request, static_assets.index, "no-cache")
+
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"])
+async def read_static(path: str, request: Request):
+    asset = static_assets.get(path)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    cache_control = IMMUTABLE if static_assets.is_immutable(path) else "no-cache"
+    return _asset_response(request, asset, cache_control)
 
 @app.get("/locations")
-async def get_locations() -> List[dict]:
+async def get_locations(request: Request, tenant: Tenant = Depends(current_tenant)):
     """Get all rooms from configuration with building info"""
-    rooms = []
-    for building_id, building in rooms_config["buildings"].items():
-        for room in building["rooms"]:
-            rooms.append({
-                "id": room["id"],
-                "name": room["name"],
-                "description": room["description"],
-                "building": building_id
-            })
-    return rooms
+    room_registry = tenant.room_registry
+    headers = {"ETag": room_registry.locations_etag, "Cache-Control": "no-cache", "Vary": "X-Tenant"}
+    if _etag_matches(request, room_registry.locations_etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=room_registry.locations_body,
+        media_type="application/json",
+        headers=headers
+    )
+
+@app.get("/availability")
+async def get_availability(
+    start: datetime,
+    end: datetime,
+    duration_minutes: int = 60,
+    room: Optional[str] = None,
+    min_capacity: Optional[int] = None,
+    tenant: Tenant = Depends(current_tenant)
+):
+    """Free slots per room for a date range, honoring buffers and room conflicts"""
+    start, end = _localize(start), _localize(end)
+    if end <= start or duration_minutes <= 0:
+        raise HTTPException(status_code=400, detail="Need start < end and a positive duration")
+    if end - start > timedelta(days=config.AVAILABILITY_MAX_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Availability can span at most {config.AVAILABILITY_MAX_DAYS} days"
+        )
+
+    room_registry = tenant.room_registry
+    if room:
+        selected = room_registry.lookup(room)
+        if selected is None:
+            raise HTTPException(status_code=404, detail=f"Room not found: {room}")
+        rooms = [selected]
+    else:
+        rooms = list(room_registry.rooms)
+    if min_capacity:
+        rooms = [r for r in rooms if r.capacity is not None and r.capacity >= min_capacity]
+
+    # Start a day early so events already running at `start` are seen as busy
+    schedule = await tenant.calendar_sync.get_schedule(start - timedelta(days=1), end)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "duration_minutes": duration_minutes,
+        "rooms": room_availability(
+            room_registry, schedule, rooms, start, end,
+            timedelta(minutes=duration_minutes), config.DEFAULT_BUFFER_MINUTES
+        )
+    }
+
+SCHEDULE_FORMATS = {
+    "ics": ("text/calendar; charset=utf-8", ics_chunks),
+    "jsonl": ("application/x-ndjson", jsonl_chunks),
+}
+
+@app.get("/rooms/{room_id}/schedule.{fmt}")
+async def get_room_schedule(
+    room_id: str,
+    fmt: str,
+    request: Request,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    include_conflicts: bool = True,
+    tenant: Tenant = Depends(current_tenant)
+):
+    """Stream a room's bookings as iCalendar or JSON lines, including rooms that block it"""
+    if fmt not in SCHEDULE_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unknown schedule format: {fmt}")
+    room = tenant.room_registry.lookup(room_id)
+    if room is None:
+        raise HTTPException(status_code=404, detail=f"Room not found: {room_id}")
+    start = _localize(start) if start else local_day_start()
+    end = _localize(end) if end else start + timedelta(days=config.SCHEDULE_FEED_DEFAULT_DAYS)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="Need start < end")
+    if end - start > timedelta(days=config.SCHEDULE_FEED_MAX_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"A schedule can span at most {config.SCHEDULE_FEED_MAX_DAYS} days"
+        )
+
+    media_type, chunks = SCHEDULE_FORMATS[fmt]
+    headers = {"Cache-Control": "no-cache", "Vary": "X-Tenant"}
+    sync = tenant.calendar_sync
+    # Validators only when the mirror answers. Its answer is one room's slice of a bounded
+    # range, so take it now and tag it by content; a version counter would restart at 0
+    # and differ between workers
+    last_changed = None
+    mirrored = None
+    if sync.covers(start, end):
+        mirrored = [event async for event in room_events(tenant, room, start, end, include_conflicts)]
+        last_changed = sync.last_changed or sync.last_sync
+        etag = content_etag(mirrored, tenant.id, room.id, start.isoformat(), end.isoformat(), include_conflicts, fmt)
+        # Weak, since the iCalendar DTSTAMP follows this worker's last change
+        headers["ETag"] = f"W/{etag}"
+        headers["Last-Modified"] = format_datetime(last_changed, usegmt=True)
+        if _etag_matches(request, etag) or (
+            "if-none-match" not in request.headers and _not_modified_since(request, last_changed)
+        ):
+            return Response(status_code=304, headers=headers)
+
+    async def replay():
+        for event in mirrored:
+            yield event
+
+    async def stream():
+        # The dependency's hold on the tenant ends before the body is sent, so take our own
+        async with tenants.use(tenant.id) as current:
+            if mirrored is not None:
+                events = replay()
+            else:
+                events = room_events(current, room, start, end, include_conflicts)
+            if fmt == "ics":
+                body = chunks(events, room, last_changed)
+            else:
+                body = chunks(events, room)
+            async for chunk in body:
+                yield chunk
+
+    return StreamingResponse(stream(), media_type=media_type, headers=headers)
+
+def _not_modified_since(request: Request, last_changed: datetime) -> bool:
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates carry whole seconds
+    return since is not None and last_changed.replace(microsecond=0) <= since
 
 @app.get("/health")
-async def health_check():
+async def health_check(response: Response, tenant: Tenant = Depends(current_tenant)):
+    luma_client = tenant.luma_client
+    if not warm_up.ready:
+        # Keep the load balancer away until the warm-up has primed this worker
+        response.status_code = 503
     return {
-        "status": "healthy",
+        "status": "healthy" if warm_up.ready else "warming_up",
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "debug_mode": config.DEBUG_MODE,
+        "tenant": tenant.id,
         "integrations": {
-            "luma": config.is_luma_configured()
-        }
+            "luma": tenant.config.is_luma_configured()
+        },
+        "event_cache": luma_client.stats(),
+        "calendar_sync": tenant.calendar_sync.status(),
+        "luma_circuit": breaker.status() if (breaker := getattr(luma_client, "breaker", None)) else None,
+        "tenants": tenants.status(),
+        "warm_up": warm_up.status(),
+        "startup_ms": startup_profile.report()
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of app and upstream metrics"""
+    return PlainTextResponse(
+        metrics.registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     if exc.headers and exc.headers.get("X-Error-Type") == "conflict":
@@ -131,24 +484,62 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         content={"detail": exc.detail}
     )
 
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after))}
+    )
+
+@app.exception_handler(RoomLockTimeout)
+async def room_lock_timeout_handler(request: Request, exc: RoomLockTimeout):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Space is busy with another booking, please retry: {exc}"},
+        headers={"Retry-After": "1"}
+    )
+
 @app.get("/events/{event_id}")
-async def get_event(event_id: str):
+async def get_event(event_id: str, request: Request, tenant: Tenant = Depends(current_tenant)):
     """Get event details including the public URL"""
     try:
-        event = luma_client.get_event(event_id)
-        return {
-            "name": event.name,
-            "start_time": event.start_time.isoformat(),
-            "end_time": event.end_time.isoformat(),
-            "location": event.location,
-            "url": event.url
-        }
+        event = await tenant.luma_client.get_event(event_id)
+    except CircuitOpenError:
+        raise
+    except httpx.HTTPStatusError as e:
+        # Luma answered but said no: the id is unknown. Anything else is Luma's problem, not a 404
+        if e.response.status_code in (400, 404):
+            raise HTTPException(status_code=404, detail=f"Event not found: {event_id}")
+        raise HTTPException(
+            status_code=502,
+            detail=f"Error fetching event details from Luma: {e.response.status_code}"
+        )
+    except httpx.TransportError as e:
+        raise HTTPException(
+            status_code=502,
+            detail=f"Error fetching event details from Luma: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=404,
             detail=f"Event not found or error fetching event details: {str(e)}"
         )
 
+    body = json.dumps({
+        "name": event.name,
+        "start_time": event.start_time.isoformat(),
+        "end_time": event.end_time.isoformat(),
+        "location": event.location,
+        "url": event.url
+    }).encode()
+    # Pollers revalidate every time, but an unchanged event costs them only a 304
+    etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "X-Tenant"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -11,4 +11,5 @@ class Event:
     event_id: Optional[str] = None
     url: Optional[str] = None
     host_email: Optional[str] = None
-    additional_hosts: Optional[List[str]] = None 
\ No newline at end of file
+    additional_hosts: Optional[List[str]] = None
+    host_results: Optional[List[dict]] = None
@@ -0,0 +1,180 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone, tzinfo
+from typing import Dict, Iterable, Iterator, List, Optional
+from models.event import Event
+
+def to_epoch(moment: datetime) -> int:
+    return int(moment.timestamp())
+
+class EventRow:
+    """Read-only view of one row of an EventColumns, shaped like an Event"""
+
+    __slots__ = ("_columns", "_position", "_start", "_end")
+
+    def __init__(self, columns: "EventColumns", position: int):
+        self._columns = columns
+        self._position = position
+        # Built on first read, so a row read for its times more than once pays for them once
+        self._start = None
+        self._end = None
+
+    @property
+    def name(self) -> str:
+        return self._columns.names[self._position]
+
+    @property
+    def start_time(self) -> datetime:
+        if self._start is None:
+            self._start = self._columns.from_epoch(self._columns.starts[self._position])
+        return self._start
+
+    @property
+    def end_time(self) -> datetime:
+        if self._end is None:
+            self._end = self._columns.from_epoch(self._columns.ends[self._position])
+        return self._end
+
+    @property
+    def location(self) -> str:
+        return self._columns.rooms[self._columns.room_ids[self._position]]
+
+    @property
+    def event_id(self) -> Optional[str]:
+        return self._columns.event_ids[self._position]
+
+    @property
+    def url(self) -> Optional[str]:
+        return self._columns.urls[self._position]
+
+    def to_event(self) -> Event:
+        return Event(
+            name=self.name,
+            start_time=self.start_time,
+            end_time=self.end_time,
+            location=self.location,
+            event_id=self.event_id,
+            url=self.url
+        )
+
+    def __repr__(self) -> str:
+        return f"EventRow({self.name!r}, {self.start_time.isoformat()}, {self.location!r})"
+
+class EventColumns:
+    """Events stored column by column, grouped by room and sorted by start within each room
+
+    Times are int64 epoch seconds in arrays and rooms are interned to small ints,
+    so a row costs a few dozen bytes instead of an Event and two datetimes.
+    Host details aren't kept; they don't matter for conflicts.
+    """
+
+    def __init__(self, tz: tzinfo = timezone.utc):
+        self.tz = tz
+        self.starts = array("q")
+        self.ends = array("q")
+        self.room_ids = array("i")
+        self.names: List[str] = []
+        self.event_ids: List[Optional[str]] = []
+        self.urls: List[Optional[str]] = []
+        self.rooms: List[str] = []
+        self._room_ids: Dict[str, int] = {}
+        # Rows of room r sit in [bounds[r], bounds[r + 1])
+        self._bounds = [0]
+        # Longest event per room bounds how far back an overlap can start
+        self._max_durations = array("q")
+
+    @classmethod
+    def from_events(cls, events: Iterable[Event], tz: tzinfo = None) -> "EventColumns":
+        events = list(events)
+        columns = cls(tz or (events[0].start_time.tzinfo if events else None) or timezone.utc)
+        for event in events:
+            columns.room_id(event.location)
+        # Lay rows out in their final order in one pass instead of inserting one by one
+        for event in sorted(events, key=lambda event: (columns._room_ids[event.location], event.start_time)):
+            columns._append(event)
+        for room_id in range(len(columns.rooms)):
+            columns._bounds[room_id + 1] = bisect_right(columns.room_ids, room_id)
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[EventRow]:
+        for position in range(len(self.starts)):
+            yield EventRow(self, position)
+
+    def rows(self) -> Iterator[tuple]:
+        """Every row as a plain tuple, times as epoch seconds, for comparing whole tables"""
+        return zip(
+            self.event_ids, self.names, self.starts, self.ends,
+            (self.rooms[room_id] for room_id in self.room_ids), self.urls
+        )
+
+    def row(self, position: int) -> EventRow:
+        return EventRow(self, position)
+
+    def to_events(self) -> List[Event]:
+        return [row.to_event() for row in self]
+
+    def from_epoch(self, seconds: int) -> datetime:
+        return datetime.fromtimestamp(seconds, self.tz)
+
+    def room_id(self, location: str) -> int:
+        """Interned id for a room name, assigning the next one on first sight"""
+        room_id = self._room_ids.get(location)
+        if room_id is None:
+            room_id = self._room_ids[location] = len(self.rooms)
+            self.rooms.append(location)
+            self._bounds.append(self._bounds[-1])
+            self._max_durations.append(0)
+        return room_id
+
+    def add(self, event: Event) -> None:
+        """Insert an event at its place within its room"""
+        room_id = self.room_id(event.location)
+        start, end = to_epoch(event.start_time), to_epoch(event.end_time)
+        position = bisect_right(self.starts, start, self._bounds[room_id], self._bounds[room_id + 1])
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.room_ids.insert(position, room_id)
+        self.names.insert(position, event.name)
+        self.event_ids.insert(position, event.event_id)
+        self.urls.insert(position, event.url)
+        for later in range(room_id + 1, len(self._bounds)):
+            self._bounds[later] += 1
+        self._max_durations[room_id] = max(self._max_durations[room_id], end - start)
+
+    def _append(self, event: Event) -> None:
+        room_id = self._room_ids[event.location]
+        start, end = to_epoch(event.start_time), to_epoch(event.end_time)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.room_ids.append(room_id)
+        self.names.append(event.name)
+        self.event_ids.append(event.event_id)
+        self.urls.append(event.url)
+        self._max_durations[room_id] = max(self._max_durations[room_id], end - start)
+
+    def overlapping_positions(self, locations: Iterable[str], start: int, end: int) -> List[int]:
+        """Positions of rows in any of the locations overlapping [start, end) in epoch seconds"""
+        positions = []
+        for location in locations:
+            room_id = self._room_ids.get(location)
+            if room_id is None:
+                continue
+            # Only rows starting in [start - max_duration, end) can overlap, and those
+            # compare as plain ints without building a datetime per row
+            room_lo, room_hi = self._bounds[room_id], self._bounds[room_id + 1]
+            lo = bisect_right(self.starts, start - self._max_durations[room_id], room_lo, room_hi)
+            hi = bisect_left(self.starts, end, lo, room_hi)
+            ends = self.ends[lo:hi]
+            positions.extend(lo + offset for offset, row_end in enumerate(ends) if row_end > start)
+        positions.sort(key=self.starts.__getitem__)
+        return positions
+
+    def overlapping(self, locations: Iterable[str], start: datetime, end: datetime) -> List[EventRow]:
+        """Rows in any of the given locations that overlap [start, end), by start"""
+        return [
+            EventRow(self, position)
+            for position in self.overlapping_positions(locations, to_epoch(start), to_epoch(end))
+        ]
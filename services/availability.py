@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple, Union
+from models.event_columns import EventColumns
+from services.room_registry import Room, RoomRegistry
+from services.room_schedule import RoomScheduleIndex
+
+def free_slots(
+    busy: Iterable[Tuple[datetime, datetime]],
+    start: datetime,
+    end: datetime,
+    duration: timedelta
+) -> List[Tuple[datetime, datetime]]:
+    """Gaps of at least `duration` inside [start, end), given busy intervals sorted by start"""
+    slots = []
+    cursor = start
+    for busy_start, busy_end in busy:
+        if busy_start >= end:
+            break
+        if busy_start - cursor >= duration:
+            slots.append((cursor, busy_start))
+        # Overlapping busy intervals merge simply by never moving the cursor backwards
+        cursor = max(cursor, busy_end)
+    if end - cursor >= duration:
+        slots.append((cursor, end))
+    return slots
+
+def room_availability(
+    registry: RoomRegistry,
+    schedule: Union[RoomScheduleIndex, EventColumns],
+    rooms: Iterable[Room],
+    start: datetime,
+    end: datetime,
+    duration: timedelta,
+    buffer_minutes: int = 0
+) -> List[dict]:
+    """Free slots per room, treating events in conflicting rooms as busy too"""
+    buffer = timedelta(minutes=buffer_minutes)
+    availability = []
+    for room in rooms:
+        locations = {room.name} | registry.conflicts_for(room.name)
+        # A new event has to keep the buffer on both sides of every existing one
+        busy = (
+            (event.start_time - buffer, event.end_time + buffer)
+            for event in schedule.overlapping(locations, start - buffer, end + buffer)
+        )
+        availability.append({
+            "id": room.id,
+            "name": room.name,
+            "building": room.building,
+            "capacity": room.capacity,
+            "free": [
+                {"start": slot_start.isoformat(), "end": slot_end.isoformat()}
+                for slot_start, slot_end in free_slots(busy, start, end, duration)
+            ]
+        })
+    return availability
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Union
+from models.event import Event
+from config import Config
+from models.event_columns import EventColumns
+from services.room_schedule import RoomScheduleIndex
+from services.event_store import SQLiteEventStore
+from services.log import get_logger, log_fields
+
+logger = get_logger("calendar_sync")
+
+class CalendarSync:
+    """Background mirror of upcoming Luma events, refreshed page by page on an interval"""
+
+    def __init__(self, client, config: Config, store: SQLiteEventStore = None):
+        self.client = client
+        # Durable copy of the window, written after each pass
+        self.store = store
+        self.window_days = config.SYNC_WINDOW_DAYS
+        self.interval_seconds = config.SYNC_INTERVAL_SECONDS
+        self.enabled = config.CALENDAR_SYNC_ENABLED and (
+            config.DEBUG_MODE or config.is_luma_configured()
+        )
+        # The only long-lived copy of the window; passes diff and prune against its rows
+        self._index = EventColumns()
+        self._ids: Set[str] = set()
+        # Range covered by the last complete pass, None until the first one finishes
+        self.window_start: Optional[datetime] = None
+        self.window_end: Optional[datetime] = None
+        self.last_sync: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.pages_fetched = 0
+        self._task: Optional[asyncio.Task] = None
+        self._synced = asyncio.Event()
+        # Events recorded while a pass is walking pages; its prune must not drop them
+        self._recorded_during_pass: Dict[str, Event] = {}
+        # Store writes run off the event loop, one at a time so a record() can't land
+        # inside a replace_range and be deleted by it
+        self._store_lock = asyncio.Lock()
+        self._store_writes: Set[asyncio.Task] = set()
+        # Bumped whenever the mirrored events change, so feeds can tell pollers nothing moved
+        self.version = 0
+        self.last_changed: Optional[datetime] = None
+
+    def start(self) -> None:
+        """Start the background refresh loop on the running event loop"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Let bookings recorded just before shutdown reach the store
+        if self._store_writes:
+            await asyncio.gather(*self._store_writes)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync_once()
+            except Exception as e:
+                # Keep serving the last good mirror, requests fall back to Luma if it ages out
+                self.last_error = str(e)
+                log_fields(logger, logging.WARNING, "calendar sync failed", error=self.last_error)
+            await asyncio.sleep(self.interval_seconds)
+
+    async def sync_once(self) -> None:
+        """Walk the rolling window one page at a time, merging each page as it arrives"""
+        now = datetime.now(timezone.utc)
+        # Start a day back so local-midnight day windows west of UTC are still covered
+        window_start = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+        window_end = window_start + timedelta(days=self.window_days + 1)
+
+        fetched: Dict[str, Event] = {}
+        self._recorded_during_pass = {}
+        cursor = None
+        while True:
+            events, cursor = await self.client.list_events_page(window_start, window_end, cursor)
+            self.pages_fetched += 1
+            for event in events:
+                fetched[event.event_id] = event
+            if not cursor:
+                break
+
+        # Whatever wasn't fetched was cancelled upstream or rolled out of the window. A booking
+        # recorded after its page was fetched isn't in it yet and stays until the next pass
+        window: List[Event] = list(fetched.values())
+        window.extend(
+            event for event_id, event in self._recorded_during_pass.items() if event_id not in fetched
+        )
+        index = EventColumns.from_events(window, tz=timezone.utc)
+        if set(index.rows()) != set(self._index.rows()):
+            self._mark_changed()
+        self._index = index
+        self._ids = set(fetched) | set(self._recorded_during_pass)
+        if self.store is not None:
+            async with self._store_lock:
+                await asyncio.to_thread(self.store.replace_range, window_start, window_end, window)
+        self.window_start = window_start
+        self.window_end = window_end
+        self.last_sync = now
+        self.last_error = None
+        self._synced.set()
+        log_fields(
+            logger, logging.DEBUG, "calendar synced",
+            events=len(self._index), duration_ms=round(
+                (datetime.now(timezone.utc) - now).total_seconds() * 1000, 1
+            )
+        )
+
+    async def wait_synced(self) -> None:
+        """Wait for the first complete pass"""
+        await self._synced.wait()
+
+    def covers(self, start_date: datetime, end_date: datetime) -> bool:
+        """Whether the mirror is fresh enough and wide enough to answer for this range"""
+        if self.last_sync is None:
+            return False
+        # A mirror that missed several refreshes is no better than asking Luma
+        if self.lag_seconds() > self.interval_seconds * 3:
+            return False
+        return self.window_start <= start_date and end_date <= self.window_end
+
+    async def get_schedule(
+        self,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Union[EventColumns, RoomScheduleIndex]:
+        """Room index for the range, from the mirror when it covers it and from the client otherwise"""
+        if self.covers(start_date, end_date):
+            return self._index
+        return await self.client.get_schedule(start_date, end_date)
+
+    def record(self, event: Event) -> None:
+        """Add a just-created event so the mirror doesn't wait for the next pass"""
+        if event.event_id and event.event_id not in self._ids:
+            self._ids.add(event.event_id)
+            self._recorded_during_pass[event.event_id] = event
+            self._index.add(event)
+            self._mark_changed()
+            if self.store is not None:
+                task = asyncio.create_task(self._store_event(event))
+                self._store_writes.add(task)
+                task.add_done_callback(self._store_writes.discard)
+
+    async def _store_event(self, event: Event) -> None:
+        try:
+            async with self._store_lock:
+                await asyncio.to_thread(self.store.add, event)
+        except Exception as e:
+            # The next pass writes the whole window again, this event included
+            log_fields(logger, logging.WARNING, "storing recorded event failed", error=str(e))
+
+    def _mark_changed(self) -> None:
+        self.version += 1
+        self.last_changed = datetime.now(timezone.utc)
+
+    def lag_seconds(self) -> Optional[float]:
+        if self.last_sync is None:
+            return None
+        return (datetime.now(timezone.utc) - self.last_sync).total_seconds()
+
+    def status(self) -> dict:
+        lag = self.lag_seconds()
+        return {
+            "enabled": self.enabled,
+            "last_sync": self.last_sync.isoformat() if self.last_sync else None,
+            "lag_seconds": round(lag, 1) if lag is not None else None,
+            "events": len(self._index),
+            "pages_fetched": self.pages_fetched,
+            "version": self.version,
+            "last_error": self.last_error
+        }
@@ -1,38 +1,58 @@
-from typing import List
+from typing import List, Set, Union
 from datetime import datetime, timedelta
-import os
-import json
+import time
 from models.event import Event
+from models.event_columns import EventColumns
 from config import Config
+from services.room_registry import RoomRegistry, load_room_registry
+from services import metrics
+from services.room_schedule import RoomScheduleIndex
 
 class ConflictChecker:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, registry: RoomRegistry = None):
         self.buffer_minutes = config.DEFAULT_BUFFER_MINUTES
-        # Load rooms configuration
-        rooms_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'rooms.json')
-        with open(rooms_path) as f:
-            rooms_config = json.load(f)
+        if registry is None:
+            registry = load_room_registry(config.ROOMS_PATH)
             
-        # Build room conflicts mapping
-        self.room_conflicts = {}
-        for building in rooms_config["buildings"].values():
-            for room in building["rooms"]:
-                if "conflicts_with" in room:
-                    self.room_conflicts[room["name"]] = room["conflicts_with"]
+        # Conflicts are already symmetric in the registry, whichever side declared them
+        self.registry = registry
+        self.related_rooms = registry.conflicts
     
-    def has_conflict(self, new_event: Event, existing_events: List[Event]) -> bool:
-        """Check if new event conflicts with any existing events"""
+    def build_index(self, events: List[Event]) -> RoomScheduleIndex:
+        """Index events by room so repeated checks avoid full scans"""
+        return RoomScheduleIndex(events)
+
+    def build_columns(self, events: List[Event]) -> EventColumns:
+        """Pack events into arrays for checks against months of history"""
+        return EventColumns.from_events(events)
+
+    def conflicting_locations(self, location: str) -> Set[str]:
+        """The location itself plus every room that conflicts with it"""
+        return {location} | self.related_rooms.get(location, frozenset())
+
+    def find_conflicts(
+        self,
+        new_event: Event,
+        existing_events: Union[List[Event], RoomScheduleIndex, EventColumns]
+    ) -> List[Event]:
+        """Return every existing event that conflicts with the new event"""
+        started = time.perf_counter()
         new_start = new_event.start_time - timedelta(minutes=self.buffer_minutes)
         new_end = new_event.end_time + timedelta(minutes=self.buffer_minutes)
-        
-        for event in existing_events:
-            # Check time overlap
-            if self._events_overlap(new_start, new_end, event.start_time, event.end_time):
-                # Check if same location or conflicting studio spaces
-                if self._locations_conflict(new_event.location, event.location):
-                    return True
-        return False
-    
+
+        if isinstance(existing_events, (RoomScheduleIndex, EventColumns)):
+            conflicts = existing_events.overlapping(
+                self.conflicting_locations(new_event.location), new_start, new_end
+            )
+        else:
+            conflicts = [
+                event for event in existing_events
+                if self._events_overlap(new_start, new_end, event.start_time, event.end_time)
+                and self._locations_conflict(new_event.location, event.location)
+            ]
+        metrics.observe_conflict_check(time.perf_counter() - started)
+        return conflicts
+
     def _events_overlap(
         self,
         start1: datetime,
@@ -45,14 +65,4 @@ class ConflictChecker:
     
     def _locations_conflict(self, location1: str, location2: str) -> bool:
         """Check if two locations conflict based on configuration"""
-        # Direct location match
-        if location1 == location2:
-            return True
-            
-        # Check configured conflicts
-        if location1 in self.room_conflicts and location2 in self.room_conflicts[location1]:
-            return True
-        if location2 in self.room_conflicts and location1 in self.room_conflicts[location2]:
-            return True
-            
-        return False
\ No newline at end of file
+        return self.registry.rooms_conflict(location1, location2)
@@ -0,0 +1,166 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+import time
+from models.event import Event
+from config import Config
+from services.room_schedule import RoomScheduleIndex
+from services.singleflight import SingleFlight
+
+class CachedLumaClient:
+    """Write-through cache of parsed events per day, and of single events by id, in front of a Luma client"""
+
+    def __init__(self, client, config: Config):
+        self.client = client
+        self.ttl_seconds = config.EVENT_CACHE_TTL_SECONDS
+        self.max_days = config.EVENT_CACHE_MAX_DAYS
+        self.max_events = config.EVENT_CACHE_MAX_EVENTS
+        # day_start -> [fetched_at, events, index], least recently used first
+        self._days = OrderedDict()
+        # event_id -> (fetched_at, event), least recently used first
+        self._events = OrderedDict()
+        # Concurrent misses for the same range share one upstream fetch
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.event_hits = 0
+        self.event_misses = 0
+
+    def __getattr__(self, name):
+        # Anything we don't cache (get_event, add_host, ...) goes straight through
+        return getattr(self.client, name)
+
+    async def get_events(self, start_date: datetime, end_date: datetime) -> List[Event]:
+        """Fetch events for a range, serving whole days from memory when possible"""
+        # Only single-day windows are cached, anything else is passed through
+        if end_date - start_date != timedelta(days=1):
+            return list(await self._flight.do(
+                (start_date, end_date), lambda: self.client.get_events(start_date, end_date)
+            ))
+
+        return list((await self._get_day(start_date, end_date))[1])
+
+    async def get_schedule(self, start_date: datetime, end_date: datetime) -> RoomScheduleIndex:
+        """Like get_events, but returns a room index that is kept with the cached day"""
+        if end_date - start_date != timedelta(days=1):
+            return RoomScheduleIndex(await self.get_events(start_date, end_date))
+
+        entry = await self._get_day(start_date, end_date)
+        if entry[2] is None:
+            entry[2] = RoomScheduleIndex(entry[1])
+        return entry[2]
+
+    async def refresh_schedule(self, start_date: datetime, end_date: datetime) -> RoomScheduleIndex:
+        """Fetch a range upstream now and cache it, never joining a fetch already in flight
+
+        For callers holding a lease shared with other workers: a fetch that started before
+        the lease was taken can miss a booking another worker committed just before it.
+        """
+        if end_date - start_date != timedelta(days=1):
+            return RoomScheduleIndex(await self.client.get_events(start_date, end_date))
+
+        entry = await self._fetch_day(start_date, end_date)
+        if entry[2] is None:
+            entry[2] = RoomScheduleIndex(entry[1])
+        return entry[2]
+
+    async def get_event(self, event_id: str) -> Event:
+        """Fetch one event, from memory if it was created, synced or looked up recently"""
+        entry = self._events.get(event_id)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+            self.event_hits += 1
+            self._events.move_to_end(event_id)
+            return entry[1]
+
+        self.event_misses += 1
+        event = await self._flight.do(("event", event_id), lambda: self.client.get_event(event_id))
+        self.remember(event)
+        return event
+
+    async def list_events_page(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Event], Optional[str]]:
+        """Pass a page through, keeping its events for later lookups by id"""
+        events, next_cursor = await self.client.list_events_page(start_date, end_date, cursor)
+        for event in events:
+            self.remember(event)
+        return events, next_cursor
+
+    def remember(self, event: Event) -> None:
+        """Keep an event for get_event; without its public URL it isn't worth serving"""
+        if not event.event_id or not event.url:
+            return
+        self._events[event.event_id] = (time.monotonic(), event)
+        self._events.move_to_end(event.event_id)
+        while len(self._events) > self.max_events:
+            self._events.popitem(last=False)
+
+    async def create_event(self, event: Event) -> str:
+        """Create the event upstream and add it to every cached day it touches"""
+        event_id = await self.client.create_event(event)
+        event.event_id = event_id
+        self.remember(event)
+        for day_start, entry in self._days.items():
+            day_end = day_start + timedelta(days=1)
+            if event.start_time < day_end and event.end_time > day_start:
+                entry[1].append(event)
+                if entry[2] is not None:
+                    entry[2].add(event)
+        return event_id
+
+    def invalidate(self, day_start: datetime = None) -> None:
+        """Drop one cached day, or everything if no day is given"""
+        if day_start is None:
+            self._days.clear()
+            self._events.clear()
+        else:
+            self._days.pop(day_start, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "days": len(self._days),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "coalesced": self._flight.shared,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "events": len(self._events),
+            "event_hits": self.event_hits,
+            "event_misses": self.event_misses
+        }
+
+    async def _get_day(self, start_date: datetime, end_date: datetime) -> list:
+        now = time.monotonic()
+        entry = self._days.get(start_date)
+        if entry is not None:
+            if now - entry[0] < self.ttl_seconds:
+                self.hits += 1
+                self._days.move_to_end(start_date)
+                return entry
+            self.stale += 1
+
+        self.misses += 1
+        return await self._flight.do(start_date, lambda: self._fetch_day(start_date, end_date))
+
+    async def _fetch_day(self, start_date: datetime, end_date: datetime) -> list:
+        started = time.monotonic()
+        events = await self.client.get_events(start_date, end_date)
+        return self._store(start_date, events, started)
+
+    def _store(self, day_start: datetime, events: List[Event], fetched_at: float) -> list:
+        entry = self._days.get(day_start)
+        # A fetch that started before the cached copy's doesn't get to replace it
+        if entry is None or entry[0] <= fetched_at:
+            entry = self._days[day_start] = [fetched_at, list(events), None]
+        self._days.move_to_end(day_start)
+        while len(self._days) > self.max_days:
+            self._days.popitem(last=False)
+            self.evictions += 1
+        return entry
@@ -0,0 +1,181 @@
+import argparse
+import random
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+from models.event import Event
+from services.room_registry import RoomRegistry, load_room_registry
+
+def _to_epoch(moment: datetime) -> int:
+    return int(moment.timestamp())
+
+def _from_epoch(seconds: int) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+class SQLiteEventStore:
+    """Durable event table indexed for room/time range queries"""
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "event_id TEXT PRIMARY KEY, name TEXT NOT NULL, location TEXT NOT NULL, "
+                "start_time INTEGER NOT NULL, end_time INTEGER NOT NULL, "
+                "url TEXT, host_email TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS events_location_time "
+                "ON events (location, start_time, end_time)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS events_time ON events (start_time, end_time)"
+            )
+        self._max_duration = self._load_max_duration()
+
+    def _load_max_duration(self) -> int:
+        row = self._conn.execute("SELECT MAX(end_time - start_time) FROM events").fetchone()
+        return row[0] or 0
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def add(self, event: Event) -> None:
+        self.add_many([event])
+
+    def add_many(self, events: Iterable[Event]) -> int:
+        """Insert or replace events in a single transaction"""
+        rows = self._rows(events)
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._insert(rows)
+        return len(rows)
+
+    def replace_range(self, start: datetime, end: datetime, events: Iterable[Event]) -> None:
+        """Make the stored events starting in [start, end) exactly the given ones"""
+        rows = self._rows(events)
+        # One transaction, so readers and a crash in between never see the window empty
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM events WHERE start_time >= ? AND start_time < ?",
+                (_to_epoch(start), _to_epoch(end))
+            )
+            self._insert(rows)
+
+    @staticmethod
+    def _rows(events: Iterable[Event]) -> List[tuple]:
+        return [(
+            event.event_id, event.name, event.location,
+            _to_epoch(event.start_time), _to_epoch(event.end_time),
+            event.url, event.host_email
+        ) for event in events]
+
+    def _insert(self, rows: List[tuple]) -> None:
+        # Callers hold the lock and the transaction
+        if not rows:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO events "
+            "(event_id, name, location, start_time, end_time, url, host_email) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        self._max_duration = max(self._max_duration, max(row[4] - row[3] for row in rows))
+
+    def get(self, event_id: str) -> Optional[Event]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT event_id, name, location, start_time, end_time, url, host_email "
+                "FROM events WHERE event_id = ?",
+                (event_id,)
+            ).fetchone()
+        return self._row_to_event(row) if row else None
+
+    def query(
+        self,
+        start: datetime,
+        end: datetime,
+        locations: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Event]:
+        """Events overlapping [start, end), optionally only in some locations, ordered by start"""
+        start_s, end_s = _to_epoch(start), _to_epoch(end)
+        # Nothing longer than the longest stored event can reach back into the range,
+        # so the start_time bound keeps this a range scan on the index
+        sql = (
+            "SELECT event_id, name, location, start_time, end_time, url, host_email FROM events "
+            "WHERE start_time >= ? AND start_time < ? AND end_time > ?"
+        )
+        params = [start_s - self._max_duration, end_s, start_s]
+        if locations is not None:
+            locations = list(locations)
+            sql += f" AND location IN ({','.join('?' * len(locations))})"
+            params.extend(locations)
+        sql += " ORDER BY start_time, event_id"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_event(row) for row in rows]
+
+    @staticmethod
+    def _row_to_event(row) -> Event:
+        event_id, name, location, start_time, end_time, url, host_email = row
+        return Event(
+            name=name,
+            start_time=_from_epoch(start_time),
+            end_time=_from_epoch(end_time),
+            location=location,
+            event_id=event_id,
+            url=url,
+            host_email=host_email
+        )
+
+def generate_synthetic_events(
+    registry: RoomRegistry,
+    count: int,
+    start: datetime,
+    days: int,
+    seed: int = 0
+) -> List[Event]:
+    """Plausible random bookings across every room, for load testing"""
+    rng = random.Random(seed)
+    rooms = [room.name for room in registry.rooms]
+    events = []
+    for number in range(count):
+        day = start + timedelta(days=rng.randrange(days))
+        event_start = day.replace(hour=rng.randrange(8, 22), minute=rng.choice((0, 15, 30, 45)))
+        events.append(Event(
+            name=f"Synthetic event {number}",
+            start_time=event_start,
+            end_time=event_start + timedelta(minutes=rng.choice((30, 60, 90, 120, 180))),
+            location=rng.choice(rooms),
+            event_id=f"evt_synthetic_{seed}_{number}"
+        ))
+    return events
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic events into a local event store")
+    parser.add_argument("path", help="SQLite file to load, e.g. local_events.db")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    store = SQLiteEventStore(args.path)
+    loaded = store.add_many(generate_synthetic_events(
+        load_room_registry(), args.count, today, args.days, args.seed
+    ))
+    print(f"Loaded {loaded} events into {args.path} ({len(store)} total)")
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Tuple
+from fastapi import HTTPException
+from config import Config
+
+class IdempotencyKeyReused(Exception):
+    """The same key was sent again with a different request body"""
+
+class IdempotencyStore:
+    """Remembers the outcome of each idempotency key for a while, and joins duplicates still in flight"""
+
+    def __init__(self, config: Config):
+        self.ttl_seconds = config.IDEMPOTENCY_TTL_SECONDS
+        self.max_keys = config.IDEMPOTENCY_MAX_KEYS
+        # key -> (expires_at, fingerprint, result, error), oldest first
+        self._completed = OrderedDict()
+        # key -> (fingerprint, task)
+        self._in_flight = {}
+        self.replays = 0
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """Run fn once per key, returning (result, replayed)"""
+        self._expire()
+        if key in self._completed:
+            _, stored_fingerprint, result, error = self._completed[key]
+            self._check(fingerprint, stored_fingerprint)
+            self.replays += 1
+            if error is not None:
+                raise error
+            return result, True
+
+        if key in self._in_flight:
+            stored_fingerprint, task = self._in_flight[key]
+            self._check(fingerprint, stored_fingerprint)
+            self.replays += 1
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(fn())
+        self._in_flight[key] = (fingerprint, task)
+        task.add_done_callback(lambda done: self._finish(key, fingerprint, done))
+        return await asyncio.shield(task), False
+
+    def _finish(self, key: str, fingerprint: str, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        if task.cancelled():
+            return
+        error = task.exception()
+        # Client errors like a 409 are final answers; anything else may succeed on retry
+        if error is not None and not (isinstance(error, HTTPException) and error.status_code < 500):
+            return
+        result = None if error is not None else task.result()
+        self._completed[key] = (time.monotonic() + self.ttl_seconds, fingerprint, result, error)
+        while len(self._completed) > self.max_keys:
+            self._completed.popitem(last=False)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        # Entries go in with the same TTL, so the oldest are always at the front
+        while self._completed:
+            key, (expires_at, *_) = next(iter(self._completed.items()))
+            if expires_at > now:
+                break
+            del self._completed[key]
+
+    @staticmethod
+    def _check(fingerprint: str, stored_fingerprint: str) -> None:
+        if fingerprint != stored_fingerprint:
+            raise IdempotencyKeyReused("Idempotency-Key was already used with a different request")
@@ -0,0 +1,89 @@
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+from typing import Optional, Set
+from config import Config
+
+ROOT_LOGGER = "luma_calendar"
+REDACTED = "[redacted]"
+# Field names whose values never reach the log output
+SENSITIVE_KEYS = {"x-luma-api-key", "api_key", "authorization", "headers", "token", "secret"}
+# Secret values scrubbed from every record; tenants add their Luma keys as they load
+_secrets: Set[str] = set()
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the app namespace, configured once by configure_logging"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+def log_fields(logger: logging.Logger, level: int, message: str, **fields) -> None:
+    """Emit a message with structured fields, skipping all work when the level is off"""
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={"fields": fields})
+
+def register_secret(secret: Optional[str]) -> None:
+    """Keep a secret value out of every log line from now on"""
+    if secret:
+        _secrets.add(secret)
+
+def _scrub(text: str) -> str:
+    for secret in _secrets:
+        text = text.replace(secret, REDACTED)
+    return text
+
+class RedactingFilter(logging.Filter):
+    """Scrubs sensitive fields and any registered secret values from records"""
+
+    def __init__(self, secrets=()):
+        super().__init__()
+        for secret in secrets:
+            register_secret(secret)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        fields = getattr(record, "fields", None)
+        if fields:
+            record.fields = {
+                key: REDACTED if key.lower() in SENSITIVE_KEYS
+                else _scrub(value) if _secrets and isinstance(value, str) else value
+                for key, value in fields.items()
+            }
+        if _secrets:
+            record.msg, record.args = _scrub(record.getMessage()), None
+        return True
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+def configure_logging(config: Config) -> None:
+    """Attach a single redacting handler to the app logger"""
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(config.LOG_LEVEL)
+    logger.propagate = False
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+    handler = logging.StreamHandler(sys.stdout)
+    if config.LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(TextFormatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    handler.addFilter(RedactingFilter(secrets=[config.API_KEY]))
+    logger.addHandler(handler)
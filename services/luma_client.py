@@ -1,75 +1,203 @@
-import requests
-import json
-from typing import List
+import asyncio
+import logging
+import time
+import httpx
+from typing import AsyncIterator, List, Optional, Tuple
 from datetime import datetime, timezone
 from models.event import Event
 from config import Config
-import os
+from services.room_registry import RoomRegistry, load_room_registry
+from services.log import get_logger, log_fields
+from services import metrics
+from services.resilience import (
+    RETRYABLE_STATUSES, CircuitBreaker, RetryPolicy, parse_retry_after
+)
+
+logger = get_logger("luma_client")
+
+NON_IDEMPOTENT_ENDPOINTS = {"event/create"}
 
 class LumaClient:
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        transport: httpx.AsyncBaseTransport = None,
+        registry: RoomRegistry = None
+    ):
         self.config = config
         self.headers = {
             "x-luma-api-key": config.API_KEY,
             "accept": "application/json",
             "content-type": "application/json"
         }
-        # Load rooms configuration
-        rooms_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'rooms.json')
-        with open(rooms_path) as f:
-            self.rooms_config = json.load(f)
+        # One pooled keep-alive client shared by every request on this worker
+        self.http = httpx.AsyncClient(
+            # Leave the key header off entirely when no key is configured
+            headers={k: v for k, v in self.headers.items() if v is not None},
+            timeout=httpx.Timeout(
+                config.LUMA_TIMEOUT_SECONDS,
+                connect=config.LUMA_CONNECT_TIMEOUT_SECONDS
+            ),
+            limits=httpx.Limits(
+                max_connections=config.LUMA_POOL_SIZE,
+                max_keepalive_connections=config.LUMA_POOL_SIZE
+            ),
+            transport=transport
+        )
+        self.rooms = registry or load_room_registry(config.ROOMS_PATH)
+        self.retry_policy = RetryPolicy(config)
+        self.breaker = CircuitBreaker(config)
+        self.endpoint_timeouts = {
+            endpoint: httpx.Timeout(seconds, connect=config.LUMA_CONNECT_TIMEOUT_SECONDS)
+            for endpoint, seconds in config.LUMA_ENDPOINT_TIMEOUTS.items()
+        }
     
-    def get_events(self, start_date: datetime, end_date: datetime) -> List[Event]:
+    async def aclose(self) -> None:
+        """Close pooled upstream connections"""
+        await self.http.aclose()
+
+    async def get_events(self, start_date: datetime, end_date: datetime) -> List[Event]:
         """Fetch events from Luma API within date range"""
-        print(f"Fetching events from {start_date} to {end_date}")
-        print(f"Headers: {self.headers}")
-        
-        all_events = []
+        return [event async for event in self.iter_events(start_date, end_date)]
+
+    async def iter_events(self, start_date: datetime, end_date: datetime) -> AsyncIterator[Event]:
+        """Yield events one at a time, only fetching the next page once this one is used up"""
+        started = time.perf_counter()
+        pages = events = size = 0
         next_cursor = None
-        
-        while True:
-            params = {
-                "after": start_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "before": end_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "pagination_limit": 100  # Get maximum events per page
-            }
-            if next_cursor:
-                params["pagination_cursor"] = next_cursor
-            
-            response = requests.get(
-                f"{self.config.BASE_URL}/calendar/list-events",
-                headers=self.headers,
-                params=params
+        try:
+            while True:
+                raw_events, next_cursor, page_size = await self._fetch_page(start_date, end_date, next_cursor)
+                pages += 1
+                size += page_size
+                for raw_event in raw_events:
+                    events += 1
+                    yield self._parse_event(raw_event)
+                # No cursor means that was the last page
+                if not next_cursor:
+                    break
+        finally:
+            # Also runs when the caller stops early and closes the generator
+            metrics.observe_pages(pages)
+            log_fields(
+                logger, logging.INFO, "listed events",
+                endpoint="calendar/list-events", pages=pages, events=events, bytes=size,
+                duration_ms=round((time.perf_counter() - started) * 1000, 1)
             )
-            print(f"Response status: {response.status_code}")
-            print(f"Response text: {response.text}")
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            # Extract events from the response - they're in the 'entries' array
-            if "entries" in data and isinstance(data["entries"], list):
-                # Each entry has an 'event' field containing the actual event data
-                for entry in data["entries"]:
-                    if "event" in entry:
-                        all_events.append(entry["event"])
-            
-            # Check if there are more events to fetch
-            if not data.get("has_more"):
-                break
-            next_cursor = data.get("next_cursor")
-            if not next_cursor:
-                break
+
+    async def list_events_page(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Event], Optional[str]]:
+        """Fetch a single page of events, returning them with the cursor for the next page"""
+        raw_events, next_cursor, _ = await self._fetch_page(start_date, end_date, cursor)
+        return [self._parse_event(raw_event) for raw_event in raw_events], next_cursor
+
+    async def _fetch_page(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str], int]:
+        params = {
+            "after": start_date.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "before": end_date.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "pagination_limit": 100  # Get maximum events per page
+        }
+        if cursor:
+            params["pagination_cursor"] = cursor
         
-        print(f"Found {len(all_events)} events")
-        parsed_events = [self._parse_event(event) for event in all_events]
-        print(f"Parsed events: {[f'{e.name} at {e.location} ({e.start_time}-{e.end_time})' for e in parsed_events]}")
-        return parsed_events
+        response = await self._request("GET", "calendar/list-events", params=params)
+        response.raise_for_status()
+        data = response.json()
+        
+        # Extract events from the response - they're in the 'entries' array
+        raw_events = []
+        if "entries" in data and isinstance(data["entries"], list):
+            # Each entry has an 'event' field containing the actual event data
+            raw_events = [entry["event"] for entry in data["entries"] if "event" in entry]
+        
+        # Check if there are more events to fetch
+        next_cursor = data.get("next_cursor") if data.get("has_more") else None
+        return raw_events, next_cursor, len(response.content)
+
+    async def _request(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        """Send one logical request to Luma with retries, backoff and the circuit breaker"""
+        self.breaker.before_call()
+        # Creating an event twice is worse than failing, so only retry what Luma never processed
+        idempotent = endpoint not in NON_IDEMPOTENT_ENDPOINTS
+        timeout = self.endpoint_timeouts.get(endpoint, httpx.USE_CLIENT_DEFAULT)
+        attempt = 0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    response = await self.http.request(
+                        method, f"{self.config.BASE_URL}/{endpoint}", timeout=timeout, **kwargs
+                    )
+                except httpx.TransportError as e:
+                    metrics.observe_upstream(endpoint, "error", time.perf_counter() - started)
+                    delay = self.retry_policy.delay(attempt)
+                    if delay is None or not (idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))):
+                        self.breaker.record_failure()
+                        raise
+                    log_fields(
+                        logger, logging.WARNING, "retrying luma request",
+                        endpoint=endpoint, attempt=attempt + 1, error=repr(e), delay_s=round(delay, 2)
+                    )
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+
+                elapsed = time.perf_counter() - started
+                metrics.observe_upstream(endpoint, response.status_code, elapsed)
+                self._log_response(endpoint, response, elapsed)
+
+                retryable = response.status_code in RETRYABLE_STATUSES and (
+                    idempotent or response.status_code == 429
+                )
+                delay = self.retry_policy.delay(
+                    attempt, parse_retry_after(response.headers.get("retry-after"))
+                ) if retryable else None
+                if delay is None:
+                    break
+                log_fields(
+                    logger, logging.WARNING, "retrying luma request",
+                    endpoint=endpoint, attempt=attempt + 1, status=response.status_code,
+                    delay_s=round(delay, 2)
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+
+        if response.status_code in RETRYABLE_STATUSES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def _log_response(self, endpoint: str, response: httpx.Response, elapsed: float) -> None:
+        duration_ms = round(elapsed * 1000, 1)
+        if response.is_success:
+            log_fields(
+                logger, logging.DEBUG, "luma request",
+                endpoint=endpoint, status=response.status_code,
+                bytes=len(response.content), duration_ms=duration_ms
+            )
+        else:
+            log_fields(
+                logger, logging.WARNING, "luma request failed",
+                endpoint=endpoint, status=response.status_code,
+                bytes=len(response.content), duration_ms=duration_ms,
+                body=response.text[:200]
+            )
     
-    def add_host(self, event_id: str, email: str) -> None:
+    async def add_host(self, event_id: str, email: str) -> None:
         """Add a host to an event"""
-        print(f"Adding host {email} to event {event_id}")  # Debug print
-        
         payload = {
             "event_api_id": event_id,
             "email": email,
@@ -77,44 +205,41 @@ class LumaClient:
             "is_visible": True
         }
         
-        print(f"Add host payload: {payload}")  # Debug print
+        response = await self._request("POST", "event/add-host", json=payload)
         
-        response = requests.post(
-            f"{self.config.BASE_URL}/event/add-host",
-            headers=self.headers,
-            json=payload
-        )
-        
-        print(f"Add host response status: {response.status_code}")  # Debug print
-        print(f"Add host response text: {response.text}")  # Debug print
-        
-        if not response.ok:
-            error_msg = f"Failed to add host: {response.text}"
-            print(error_msg)  # Debug print
-            raise Exception(error_msg)
+        if not response.is_success:
+            raise Exception(f"Failed to add host: {response.text}")
             
         return response.json()
 
-    def create_event(self, event: Event) -> str:
+    async def _add_hosts(self, event_id: str, emails: List[str]) -> List[dict]:
+        """Add hosts concurrently, returning one outcome per email in the given order"""
+        semaphore = asyncio.Semaphore(self.config.LUMA_HOST_FANOUT)
+
+        async def attach(email: str) -> dict:
+            async with semaphore:
+                try:
+                    await self.add_host(event_id, email)
+                    return {"email": email, "status": "added"}
+                except Exception as e:
+                    log_fields(
+                        logger, logging.WARNING, "failed to add host",
+                        event_id=event_id, email=email, error=str(e)
+                    )
+                    return {"email": email, "status": "failed", "error": str(e)}
+
+        return list(await asyncio.gather(*(attach(email) for email in emails)))
+
+    async def create_event(self, event: Event) -> str:
         """Create new event in Luma"""
         # Find the room in our configuration
-        room_info = None
-        building_info = None
-        for building_id, building in self.rooms_config["buildings"].items():
-            for room in building["rooms"]:
-                if room["name"] == event.location:
-                    room_info = room
-                    building_info = building
-                    break
-            if room_info:
-                break
-        
+        room_info = self.rooms.by_name.get(event.location)
         if not room_info:
             raise ValueError(f"Room not found: {event.location}")
         
         # Format address with + separator
-        base_address = building_info['address'].split(',')[0]  # Get just the street address part
-        address = f"{base_address}, San Francisco + {room_info['name']}"
+        base_address = room_info.address.split(',')[0]  # Get just the street address part
+        address = f"{base_address}, San Francisco + {room_info.name}"
         
         # Convert datetime to UTC
         start_time = event.start_time.astimezone(timezone.utc)
@@ -130,68 +255,42 @@ class LumaClient:
                 "type": "manual",
                 "address": address
             },
-            "geo_latitude": self.rooms_config["coordinates"]["latitude"],
-            "geo_longitude": self.rooms_config["coordinates"]["longitude"]
+            "geo_latitude": self.rooms.coordinates["latitude"],
+            "geo_longitude": self.rooms.coordinates["longitude"]
         }
         
-        print(f"Creating event with payload: {payload}")  # Debug print
-        
-        response = requests.post(
-            f"{self.config.BASE_URL}/event/create",
-            headers=self.headers,
-            json=payload
-        )
-        
-        if not response.ok:
-            print(f"Error response: {response.text}")  # Debug print
-            print(f"Status code: {response.status_code}")
-            print(f"Headers: {response.headers}")
-        
+        response = await self._request("POST", "event/create", json=payload)
         response.raise_for_status()
-        event_id = response.json()["api_id"]
+        created = response.json()
+        event_id = created["api_id"]
+        # When Luma echoes the event back, its public URL saves a lookup later
+        if event_data := created.get("event"):
+            event.url = event_data.get("url")
 
         # If host email is provided, add them as a host
         if event.host_email:
-            try:
-                print(f"Attempting to add primary host {event.host_email}")  # Debug print
-                self.add_host(event_id, event.host_email)
-                print("Successfully added primary host")  # Debug print
-                
-                # Add additional hosts if they exist
-                if event.additional_hosts:
-                    for additional_host in event.additional_hosts:
-                        try:
-                            print(f"Attempting to add additional host {additional_host}")  # Debug print
-                            self.add_host(event_id, additional_host)
-                            print(f"Successfully added additional host {additional_host}")  # Debug print
-                        except Exception as e:
-                            print(f"Failed to add additional host {additional_host}: {str(e)}")  # Debug print
-                            # Continue with other hosts even if one fails
-                            continue
-                            
-            except Exception as e:
-                error_msg = f"Failed to add hosts: {str(e)}"
-                print(error_msg)  # Debug print
-                raise Exception(error_msg)
+            hosts = [event.host_email] + [
+                host for host in (event.additional_hosts or []) if host != event.host_email
+            ]
+            # The event exists upstream by now, so a host Luma refuses - primary included -
+            # is reported in host_results instead of failing a booking that went through
+            event.host_results = await self._add_hosts(event_id, hosts)
 
+        log_fields(
+            logger, logging.INFO, "created event",
+            event_id=event_id, location=event.location,
+            hosts=len(event.host_results or [])
+        )
         return event_id
     
-    def get_event(self, event_id: str) -> Event:
+    async def get_event(self, event_id: str) -> Event:
         """Fetch a specific event by ID"""
-        response = requests.get(
-            f"{self.config.BASE_URL}/event/get",
-            headers=self.headers,
-            params={"api_id": event_id}
-        )
-        print(f"Get event response: {response.text}")  # Debug log
+        response = await self._request("GET", "event/get", params={"api_id": event_id})
         response.raise_for_status()
         event_data = response.json()["event"]
-        print(f"Event data from API: {event_data}")  # Debug log
         return self._parse_event(event_data)
     
     def _parse_event(self, event_data: dict) -> Event:
-        print(f"Raw event data: {event_data}")  # Debug print
-        
         # Extract location from geo_address_json
         location = None
         if geo_json := event_data.get("geo_address_json"):
@@ -207,14 +306,7 @@ class LumaClient:
         # If we still don't have a location, try to extract from the event name
         if not location:
             # Look for room names in the event name
-            event_text = event_data.get('name', '')
-            for building in self.rooms_config["buildings"].values():
-                for room in building["rooms"]:
-                    if room["name"] in event_text:
-                        location = room["name"]
-                        break
-                if location:
-                    break
+            location = self.rooms.find_room_in(event_data.get('name', ''))
         
         # If we still don't have a location, use a default
         if not location:
@@ -0,0 +1,147 @@
+import bisect
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+# Upper bounds in seconds, tuned for calls between a millisecond and a slow Luma page walk
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _label_key(labels: dict) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _format_labels(key: Tuple[Tuple[str, str], ...], extra: dict = None) -> str:
+    pairs = list(key) + sorted((extra or {}).items())
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return "\n".join(lines)
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count], sum
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][position] += 1
+            entry[1] += value
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(_label_key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(key, {'le': le})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return "\n".join(lines)
+
+class Gauge:
+    """Value read from a callback at scrape time, so nothing is recorded on the hot path"""
+
+    def __init__(self, name: str, help_text: str, read):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for labels, value in self.read():
+            lines.append(f"{self.name}{_format_labels(_label_key(labels))} {value}")
+        return "\n".join(lines)
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def gauge(self, name: str, help_text: str, read) -> Gauge:
+        # Re-registering replaces the callback, e.g. when clients are rebuilt
+        self._metrics[name] = Gauge(name, help_text, read)
+        return self._metrics[name]
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+registry = MetricsRegistry()
+
+request_latency = registry.histogram(
+    "http_request_duration_seconds", "Latency of requests handled by the app, per route"
+)
+upstream_latency = registry.histogram(
+    "luma_request_duration_seconds", "Latency of Luma API calls, per endpoint and status"
+)
+list_pages = registry.histogram(
+    "luma_list_events_pages", "Pages fetched per list-events walk", buckets=(1, 2, 3, 5, 10, 20, 50)
+)
+conflict_check_latency = registry.histogram(
+    "conflict_check_duration_seconds", "Time spent finding conflicts for one booking",
+    buckets=(0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0)
+)
+booking_conflicts = registry.counter(
+    "booking_conflicts_total", "Bookings rejected with a 409, per room id"
+)
+bookings = registry.counter(
+    "bookings_total", "Booking attempts that reached the conflict check, per room id"
+)
+
+# Instrumentation surface used by the app, LumaClient and ConflictChecker
+
+def observe_request(route: str, method: str, status: int, seconds: float) -> None:
+    request_latency.observe(seconds, route=route, method=method, status=status)
+
+def observe_upstream(endpoint: str, status, seconds: float) -> None:
+    upstream_latency.observe(seconds, endpoint=endpoint, status=status)
+
+def observe_pages(pages: int) -> None:
+    list_pages.observe(pages)
+
+def observe_conflict_check(seconds: float) -> None:
+    conflict_check_latency.observe(seconds)
+
+def observe_booking(room_id: Optional[str], conflicted: bool) -> None:
+    # Locations come from clients; names outside rooms.json share one series
+    room = room_id or "unknown"
+    bookings.inc(room=room)
+    if conflicted:
+        booking_conflicts.inc(room=room)
@@ -1,24 +1,30 @@
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
 from datetime import datetime, timedelta
+import uuid
 import pytz
 from models.event import Event
+from services.event_store import SQLiteEventStore
+
+# Page size used to mimic Luma's cursor pagination
+PAGE_SIZE = 100
 
 class MockLumaClient:
-    def __init__(self):
-        self.events = []
-        self._add_sample_events()
+    def __init__(self, store: SQLiteEventStore = None):
+        # In-memory unless given a file-backed store, which then survives restarts
+        self.store = store if store is not None else SQLiteEventStore()
+        if not len(self.store):
+            self._add_sample_events()
 
     def _add_sample_events(self):
         """Add some sample events for testing"""
         pt_timezone = pytz.timezone('America/Los_Angeles')
         now = datetime.now(pt_timezone).replace(minute=0, second=0, microsecond=0)
-        self.events = [
+        self.store.add_many([
             Event(
                 name="Daily Standup",
                 start_time=now.replace(hour=10),
                 end_time=now.replace(hour=10, minute=30),
                 location="Conference Room A",
-                description="Daily team sync",
                 event_id="evt_mock_1"
             ),
             Event(
@@ -26,34 +32,63 @@ class MockLumaClient:
                 start_time=now.replace(hour=12),
                 end_time=now.replace(hour=13),
                 location="Collaboration Space",
-                description="Team building lunch",
                 event_id="evt_mock_2"
             )
-        ]
+        ])
+
+    @staticmethod
+    def _localize(moment: datetime) -> datetime:
+        # Ensure dates are timezone-aware
+        if moment.tzinfo is None:
+            return pytz.timezone('America/Los_Angeles').localize(moment)
+        return moment
 
-    def get_events(self, start_date: datetime, end_date: datetime) -> List[Event]:
+    async def aclose(self) -> None:
+        """Nothing to close, kept for parity with LumaClient"""
+
+    async def get_events(self, start_date: datetime, end_date: datetime) -> List[Event]:
         """Return mock events within date range"""
-        # Ensure both dates are timezone-aware
-        if start_date.tzinfo is None:
-            pt_timezone = pytz.timezone('America/Los_Angeles')
-            start_date = pt_timezone.localize(start_date)
-        if end_date.tzinfo is None:
-            pt_timezone = pytz.timezone('America/Los_Angeles')
-            end_date = pt_timezone.localize(end_date)
-            
-        return [
-            event for event in self.events
-            if start_date <= event.start_time <= end_date
-        ]
-
-    def create_event(self, event: Event) -> str:
+        return self.store.query(self._localize(start_date), self._localize(end_date))
+
+    async def iter_events(self, start_date: datetime, end_date: datetime) -> AsyncIterator[Event]:
+        cursor = None
+        while True:
+            events, cursor = await self.list_events_page(start_date, end_date, cursor)
+            for event in events:
+                yield event
+            if not cursor:
+                break
+
+    async def list_events_page(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Event], Optional[str]]:
+        """One page of events, with the offset of the next page as its cursor"""
+        offset = int(cursor or 0)
+        events = self.store.query(
+            self._localize(start_date), self._localize(end_date),
+            limit=PAGE_SIZE + 1, offset=offset
+        )
+        if len(events) > PAGE_SIZE:
+            return events[:PAGE_SIZE], str(offset + PAGE_SIZE)
+        return events, None
+
+    async def get_event(self, event_id: str) -> Event:
+        event = self.store.get(event_id)
+        if event is None:
+            raise KeyError(f"Mock event not found: {event_id}")
+        return event
+
+    async def add_host(self, event_id: str, email: str) -> dict:
+        return {}
+
+    async def create_event(self, event: Event) -> str:
         """Create a mock event"""
-        # Ensure event times are timezone-aware
-        if event.start_time.tzinfo is None or event.end_time.tzinfo is None:
-            pt_timezone = pytz.timezone('America/Los_Angeles')
-            event.start_time = pt_timezone.localize(event.start_time)
-            event.end_time = pt_timezone.localize(event.end_time)
-            
-        event.event_id = f"evt_mock_{len(self.events) + 1}"
-        self.events.append(event)
-        return event.event_id 
\ No newline at end of file
+        event.start_time = self._localize(event.start_time)
+        event.end_time = self._localize(event.end_time)
+        event.event_id = f"evt_mock_{uuid.uuid4().hex[:12]}"
+        event.url = f"https://lu.ma/{event.event_id}"
+        self.store.add(event)
+        return event.event_id
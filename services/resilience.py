@@ -0,0 +1,94 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+from config import Config
+
+# Statuses worth another attempt: Luma throttling us or having a bad moment
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Luma while the circuit breaker is open"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Luma is unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, given as seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+class RetryPolicy:
+    def __init__(self, config: Config):
+        self.max_attempts = config.LUMA_MAX_RETRIES + 1
+        self.base_delay = config.LUMA_RETRY_BASE_SECONDS
+        self.max_delay = config.LUMA_RETRY_MAX_SECONDS
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to sleep before the next attempt, or None if we should give up"""
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if retry_after is not None:
+            # Waiting longer than we'd ever back off would just hold the user's request hostage
+            return retry_after if retry_after <= self.max_delay else None
+        # Full jitter keeps retrying workers from hitting Luma in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures, letting one probe through once reset"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, config: Config):
+        self.failure_threshold = config.LUMA_BREAKER_THRESHOLD
+        self.reset_seconds = config.LUMA_BREAKER_RESET_SECONDS
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through right now"""
+        if self.state == self.CLOSED:
+            return
+        remaining = self.reset_seconds - (time.monotonic() - self.opened_at)
+        if self.state == self.OPEN and remaining <= 0:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        raise CircuitOpenError(max(remaining, 1))
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def abandon(self) -> None:
+        """A call was cancelled before it told us anything about Luma"""
+        self._probe_in_flight = False
+
+    def status(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures}
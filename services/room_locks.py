@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, List
+from config import Config
+from services.conflict_checker import ConflictChecker
+from services.log import get_logger, log_fields
+
+logger = get_logger("room_locks")
+
+class RoomLockTimeout(Exception):
+    """Another booking held one of the rooms for longer than we were willing to wait"""
+
+class InProcessLockBackend:
+    """asyncio locks per room, enough when a single worker serves all bookings"""
+
+    shared = False
+
+    def __init__(self, timeout_seconds: float):
+        self.timeout_seconds = timeout_seconds
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._users: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, rooms: List[str]):
+        # Always lock in sorted order so overlapping room sets can't deadlock
+        rooms = sorted(rooms)
+        for room in rooms:
+            self._users[room] = self._users.get(room, 0) + 1
+            self._locks.setdefault(room, asyncio.Lock())
+        acquired = []
+        try:
+            async with asyncio.timeout(self.timeout_seconds):
+                for room in rooms:
+                    await self._locks[room].acquire()
+                    acquired.append(room)
+        except TimeoutError:
+            self._release(acquired, rooms)
+            raise RoomLockTimeout(f"Timed out waiting for {', '.join(rooms)}") from None
+        except BaseException:
+            self._release(acquired, rooms)
+            raise
+        try:
+            yield
+        finally:
+            self._release(acquired, rooms)
+
+    def _release(self, acquired: List[str], rooms: List[str]) -> None:
+        for room in reversed(acquired):
+            self._locks[room].release()
+        # Forget locks nobody is using so arbitrary location strings can't pile up
+        for room in rooms:
+            self._users[room] -= 1
+            if not self._users[room]:
+                del self._users[room]
+                del self._locks[room]
+
+class SQLiteLeaseBackend:
+    """Room leases in a SQLite file, shared by every worker on the same machine"""
+
+    shared = True
+
+    def __init__(self, path: str, lease_seconds: float, timeout_seconds: float, poll_seconds: float = 0.05):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.timeout_seconds = timeout_seconds
+        self.poll_seconds = poll_seconds
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS room_leases ("
+                "room TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def _try_acquire(self, rooms: List[str], holder: str) -> bool:
+        """Take every room or none of them, in one write transaction"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            placeholders = ",".join("?" * len(rooms))
+            now = time.time()
+            # Leases left behind by a crashed worker lapse on their own
+            conn.execute(
+                f"DELETE FROM room_leases WHERE room IN ({placeholders}) AND expires_at < ?",
+                (*rooms, now)
+            )
+            held = conn.execute(
+                f"SELECT 1 FROM room_leases WHERE room IN ({placeholders}) LIMIT 1", rooms
+            ).fetchone()
+            if held:
+                conn.execute("ROLLBACK")
+                return False
+            conn.executemany(
+                "INSERT INTO room_leases (room, holder, expires_at) VALUES (?, ?, ?)",
+                [(room, holder, now + self.lease_seconds) for room in rooms]
+            )
+            conn.execute("COMMIT")
+            return True
+        finally:
+            conn.close()
+
+    def _renew(self, holder: str) -> int:
+        """Push the holder's leases out by another lease_seconds, returning how many it still has"""
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "UPDATE room_leases SET expires_at = ? WHERE holder = ?",
+                (time.time() + self.lease_seconds, holder)
+            ).rowcount
+        finally:
+            conn.close()
+
+    async def _keep_alive(self, rooms: List[str], holder: str) -> None:
+        # A booking can outlast one lease while Luma is slow; renewing well before expiry
+        # keeps another worker from taking the rooms halfway through it
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if await asyncio.to_thread(self._renew, holder) < len(rooms):
+                log_fields(
+                    logger, logging.WARNING, "room lease lapsed before renewal",
+                    rooms=",".join(rooms), lease_seconds=self.lease_seconds
+                )
+                return
+
+    def _release(self, holder: str) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM room_leases WHERE holder = ?", (holder,))
+        finally:
+            conn.close()
+
+    @asynccontextmanager
+    async def hold(self, rooms: List[str]):
+        rooms = sorted(rooms)
+        holder = f"{os.getpid()}-{uuid.uuid4().hex}"
+        deadline = time.monotonic() + self.timeout_seconds
+        try:
+            while not await asyncio.to_thread(self._try_acquire, rooms, holder):
+                if time.monotonic() >= deadline:
+                    raise RoomLockTimeout(f"Timed out waiting for {', '.join(rooms)}")
+                await asyncio.sleep(self.poll_seconds)
+        except asyncio.CancelledError:
+            # The worker thread may still have taken the lease after we were cancelled
+            await asyncio.shield(asyncio.to_thread(self._release, holder))
+            raise
+        renewal = asyncio.create_task(self._keep_alive(rooms, holder))
+        try:
+            yield
+        finally:
+            renewal.cancel()
+            try:
+                await renewal
+            except asyncio.CancelledError:
+                pass
+            await asyncio.to_thread(self._release, holder)
+
+class RoomLockManager:
+    """Serializes bookings per room and every room it conflicts with"""
+
+    def __init__(self, config: Config, conflict_checker: ConflictChecker):
+        self.conflict_checker = conflict_checker
+        if config.ROOM_LOCK_BACKEND == "sqlite":
+            self.backend = SQLiteLeaseBackend(
+                config.ROOM_LOCK_PATH,
+                config.ROOM_LOCK_LEASE_SECONDS,
+                config.ROOM_LOCK_TIMEOUT_SECONDS
+            )
+        elif config.ROOM_LOCK_BACKEND == "memory":
+            self.backend = InProcessLockBackend(config.ROOM_LOCK_TIMEOUT_SECONDS)
+        else:
+            raise ValueError(f"Unknown ROOM_LOCK_BACKEND: {config.ROOM_LOCK_BACKEND}")
+
+    @property
+    def shared(self) -> bool:
+        """Whether the locks also hold against other worker processes"""
+        return self.backend.shared
+
+    def hold(self, locations: Iterable[str]):
+        """Context manager holding the given rooms and everything that conflicts with them"""
+        rooms = set()
+        for location in locations:
+            rooms |= self.conflict_checker.conflicting_locations(location)
+        return self.backend.hold(sorted(rooms))
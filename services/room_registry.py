@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import FrozenSet, List, Optional, Tuple
+
+DEFAULT_ROOMS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'rooms.json')
+CAPACITY_PATTERN = re.compile(r"up to (\d+) people")
+
+def _parse_capacity(room: dict) -> Optional[int]:
+    """Explicit capacity if given, otherwise the "up to N people" in the description"""
+    if "capacity" in room:
+        return int(room["capacity"])
+    match = CAPACITY_PATTERN.search(room.get("description", ""))
+    return int(match.group(1)) if match else None
+
+@dataclass(frozen=True)
+class Room:
+    id: str
+    name: str
+    description: str
+    building: str
+    address: str
+    conflicts_with: FrozenSet[str] = frozenset()
+    capacity: Optional[int] = None
+
+class RoomRegistry:
+    """Immutable view of rooms.json with every lookup precomputed"""
+
+    def __init__(self, rooms_config: dict):
+        rooms = []
+        for building_id, building in rooms_config["buildings"].items():
+            for room in building["rooms"]:
+                rooms.append(Room(
+                    id=room["id"],
+                    name=room["name"],
+                    description=room["description"],
+                    building=building_id,
+                    address=building["address"],
+                    conflicts_with=frozenset(room.get("conflicts_with", [])),
+                    capacity=_parse_capacity(room)
+                ))
+        self.rooms = tuple(rooms)
+        self.coordinates = MappingProxyType(dict(rooms_config["coordinates"]))
+        self.by_id = MappingProxyType({room.id: room for room in self.rooms})
+        self.by_name = MappingProxyType({room.name: room for room in self.rooms})
+
+        # Conflicts apply both ways, whichever side declared them. Deliberately not
+        # transitive: North and South Studio both clash with Full Studio, not with each other
+        conflicts = {room.name: set() for room in self.rooms}
+        for room in self.rooms:
+            for other in room.conflicts_with:
+                conflicts[room.name].add(other)
+                conflicts.setdefault(other, set()).add(room.name)
+        self.conflicts = MappingProxyType({
+            name: frozenset(others) for name, others in conflicts.items() if others
+        })
+        self.conflict_problems = tuple(self._check_conflicts())
+
+        # Longest names first so "Full Studio" wins over a shorter name inside it
+        names = sorted(self.by_name, key=len, reverse=True)
+        self._name_pattern = re.compile("|".join(re.escape(name) for name in names))
+
+        # /locations never changes while we run, so serialize it once
+        self.locations_body = json.dumps([{
+            "id": room.id,
+            "name": room.name,
+            "description": room.description,
+            "building": room.building
+        } for room in self.rooms]).encode()
+        self.locations_etag = f'"{hashlib.sha256(self.locations_body).hexdigest()[:16]}"'
+
+    def _check_conflicts(self) -> List[Tuple[str, str]]:
+        """(kind, message) for every conflicts_with entry that looks like a config mistake"""
+        problems = []
+        for room in self.rooms:
+            for other in sorted(room.conflicts_with):
+                if other == room.name:
+                    problems.append(("self", f"{room.name} lists itself in conflicts_with"))
+                elif other not in self.by_name:
+                    problems.append(("dangling", f"{room.name} conflicts with unknown room {other!r}"))
+                elif room.name not in self.by_name[other].conflicts_with:
+                    problems.append((
+                        "asymmetric",
+                        f"{room.name} lists {other} in conflicts_with but not the other way round"
+                    ))
+        return problems
+
+    def rooms_conflict(self, location1: str, location2: str) -> bool:
+        """Whether two locations can't be booked at the same time"""
+        return location1 == location2 or location2 in self.conflicts.get(location1, ())
+
+    def conflicts_for(self, name: str) -> FrozenSet[str]:
+        """Rooms that can't be booked at the same time as this one"""
+        return self.conflicts.get(name, frozenset())
+
+    def lookup(self, room: str) -> Optional[Room]:
+        """Find a room by id or by name"""
+        return self.by_id.get(room) or self.by_name.get(room)
+
+    def find_room_in(self, text: str) -> Optional[str]:
+        """Name of the first room mentioned in free text, if any"""
+        match = self._name_pattern.search(text)
+        return match.group(0) if match else None
+
+def read_room_registry(path: str = DEFAULT_ROOMS_PATH) -> RoomRegistry:
+    """Parse a rooms.json, for callers that own the result's lifetime"""
+    with open(path) as f:
+        return RoomRegistry(json.load(f))
+
+@lru_cache(maxsize=None)
+def load_room_registry(path: str = DEFAULT_ROOMS_PATH) -> RoomRegistry:
+    """Parse a rooms.json once per process"""
+    return read_room_registry(path)
+
+if __name__ == "__main__":
+    import sys
+
+    # python -m services.room_registry [rooms.json] exits non-zero on suspicious conflicts_with entries
+    registry = read_room_registry(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ROOMS_PATH)
+    for kind, message in registry.conflict_problems:
+        print(f"{kind}: {message}")
+    print(f"{len(registry.rooms)} rooms, {len(registry.conflict_problems)} problems")
+    sys.exit(1 if registry.conflict_problems else 0)
@@ -0,0 +1,56 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+from models.event import Event
+
+class _RoomTimeline:
+    """Events for a single location kept sorted by start time"""
+
+    def __init__(self):
+        self.starts = []
+        self.events = []
+        # Longest event seen so far bounds how far back an overlap can start
+        self.max_duration = timedelta(0)
+
+    def add(self, event: Event) -> None:
+        position = bisect_right(self.starts, event.start_time)
+        self.starts.insert(position, event.start_time)
+        self.events.insert(position, event)
+        self.max_duration = max(self.max_duration, event.end_time - event.start_time)
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Event]:
+        # Anything overlapping [start, end) starts after start - max_duration and before end
+        lo = bisect_right(self.starts, start - self.max_duration)
+        hi = bisect_left(self.starts, end)
+        return [event for event in self.events[lo:hi] if event.end_time > start]
+
+class RoomScheduleIndex:
+    """Per-location interval index answering overlap queries in logarithmic time"""
+
+    def __init__(self, events: Iterable[Event] = ()):
+        self._timelines: Dict[str, _RoomTimeline] = {}
+        for event in events:
+            self.add(event)
+
+    def __len__(self) -> int:
+        return sum(len(timeline.events) for timeline in self._timelines.values())
+
+    def __iter__(self):
+        for timeline in self._timelines.values():
+            yield from timeline.events
+
+    def add(self, event: Event) -> None:
+        timeline = self._timelines.get(event.location)
+        if timeline is None:
+            timeline = self._timelines[event.location] = _RoomTimeline()
+        timeline.add(event)
+
+    def overlapping(self, locations: Iterable[str], start: datetime, end: datetime) -> List[Event]:
+        """Return events in any of the given locations that overlap [start, end)"""
+        matches = []
+        for location in locations:
+            timeline = self._timelines.get(location)
+            if timeline is not None:
+                matches.extend(timeline.overlapping(start, end))
+        matches.sort(key=lambda event: event.start_time)
+        return matches
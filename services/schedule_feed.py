@@ -0,0 +1,139 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterable, Optional
+from models.event import Event
+from services.room_registry import Room
+
+# Events per chunk written to the response; big enough to avoid tiny writes,
+# small enough that a long range never sits in memory as one body
+CHUNK_EVENTS = 50
+
+async def room_events(
+    tenant,
+    room: Room,
+    start: datetime,
+    end: datetime,
+    include_conflicts: bool = True
+) -> AsyncIterator[Event]:
+    """Events in the room, and in rooms that block it, overlapping [start, end), by start
+
+    Served from the calendar mirror when it covers the range, otherwise paged
+    from Luma one page at a time.
+    """
+    locations = {room.name}
+    if include_conflicts:
+        locations |= tenant.room_registry.conflicts_for(room.name)
+
+    sync = tenant.calendar_sync
+    if sync.covers(start, end):
+        for event in (await sync.get_schedule(start, end)).overlapping(locations, start, end):
+            yield event
+        return
+
+    # Luma filters on start time, so look a day back for events already running at `start`
+    async for event in tenant.luma_client.iter_events(start - timedelta(days=1), end):
+        if event.location in locations and event.end_time > start and event.start_time < end:
+            yield event
+
+def content_etag(events: Iterable[Event], *parts) -> str:
+    """Quoted tag over what a feed shows of each event, plus whatever else shapes the body
+
+    Any worker mirroring the same events computes the same tag, restarts included.
+    """
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode())
+    for event in events:
+        digest.update(json.dumps([
+            event.event_id, event.start_time.isoformat(), event.end_time.isoformat(),
+            event.name, event.location, event.url
+        ]).encode())
+    return f'"{digest.hexdigest()[:16]}"'
+
+def _ics_escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+    )
+
+def _ics_time(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def _ics_fold(line: str) -> str:
+    """Split a content line into 75-octet pieces as RFC 5545 asks"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    pieces, current = [], b""
+    for char in line:
+        char_bytes = char.encode("utf-8")
+        # Continuation lines start with a space, which counts toward their 75
+        if len(current) + len(char_bytes) > (75 if not pieces else 74):
+            pieces.append(current)
+            current = b""
+        current += char_bytes
+    pieces.append(current)
+    return "\r\n ".join(piece.decode("utf-8") for piece in pieces) + "\r\n"
+
+def _fallback_uid(event: Event) -> str:
+    return hashlib.sha256(f"{event.name}|{event.start_time.isoformat()}|{event.location}".encode()).hexdigest()[:24]
+
+def _ics_event(event: Event, room: Room, stamp: str) -> str:
+    conflicting = event.location != room.name
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{event.event_id or _fallback_uid(event)}@lu.ma",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_ics_time(event.start_time)}",
+        f"DTEND:{_ics_time(event.end_time)}",
+        f"SUMMARY:{_ics_escape(event.name)}",
+        f"LOCATION:{_ics_escape(event.location)}",
+        "TRANSP:OPAQUE",
+    ]
+    if event.url:
+        lines.append(f"URL:{event.url}")
+    if conflicting:
+        # Booked in a room that shares space with this one, so this room is blocked too
+        lines.append(f"X-BLOCKED-BY-ROOM:{_ics_escape(event.location)}")
+    lines.append("END:VEVENT")
+    return "".join(_ics_fold(line) for line in lines)
+
+async def ics_chunks(
+    events: AsyncIterator[Event],
+    room: Room,
+    last_changed: Optional[datetime] = None
+) -> AsyncIterator[bytes]:
+    """A VCALENDAR for the room, written out CHUNK_EVENTS events at a time"""
+    stamp = _ics_time(last_changed or datetime.now(timezone.utc))
+    yield "".join(_ics_fold(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//The Commons//Luma Calendar//EN",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_ics_escape(room.name)}",
+    )).encode("utf-8")
+    chunk = []
+    async for event in events:
+        chunk.append(_ics_event(event, room, stamp))
+        if len(chunk) >= CHUNK_EVENTS:
+            yield "".join(chunk).encode("utf-8")
+            chunk = []
+    chunk.append("END:VCALENDAR\r\n")
+    yield "".join(chunk).encode("utf-8")
+
+async def jsonl_chunks(events: AsyncIterator[Event], room: Room) -> AsyncIterator[bytes]:
+    """One JSON object per line and event, written out CHUNK_EVENTS events at a time"""
+    chunk = []
+    async for event in events:
+        chunk.append(json.dumps({
+            "event_id": event.event_id,
+            "name": event.name,
+            "start_time": event.start_time.isoformat(),
+            "end_time": event.end_time.isoformat(),
+            "location": event.location,
+            "url": event.url,
+            "blocked_by_other_room": event.location != room.name
+        }) + "\n")
+        if len(chunk) >= CHUNK_EVENTS:
+            yield "".join(chunk).encode("utf-8")
+            chunk = []
+    if chunk:
+        yield "".join(chunk).encode("utf-8")
@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import logging
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import pytz
+from services.log import get_logger, log_fields
+
+logger = get_logger("startup")
+
+# Event days are Pacific days, the same as the events Luma gets from us
+LOCAL_TIMEZONE = pytz.timezone("America/Los_Angeles")
+
+class StartupProfile:
+    """Wall-clock time of each startup phase, from imports to the end of warm-up"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, name: str) -> None:
+        """Record the time since the process started building the app"""
+        self.phases[name] = time.perf_counter() - self.started
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+
+    def report(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()}
+
+    def log(self) -> None:
+        log_fields(logger, logging.INFO, "startup profile", **{
+            f"{name}_ms": ms for name, ms in self.report().items()
+        })
+
+profile = StartupProfile()
+
+def local_day_start(now: datetime = None) -> datetime:
+    now = (now or datetime.now(LOCAL_TIMEZONE)).astimezone(LOCAL_TIMEZONE)
+    return LOCAL_TIMEZONE.localize(datetime(now.year, now.month, now.day))
+
+class WarmUp:
+    """Optional first-request work done before the worker calls itself ready
+
+    Builds the default tenant, which opens its pooled Luma connection while fetching
+    today's events, and waits for the calendar mirror's first pass when sync is on.
+    A warm-up that fails or times out is logged and the worker goes ready anyway:
+    every path it primes also works cold.
+    """
+
+    def __init__(self, enabled: bool, timeout_seconds: float):
+        self.enabled = enabled
+        self.timeout_seconds = timeout_seconds
+        self.state = "running" if enabled else "skipped"
+        self.error: Optional[str] = None
+        self.duration_ms: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state != "running"
+
+    def start(self, tenants) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run(tenants))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, tenants) -> None:
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.timeout_seconds):
+                with profile.phase("warm_up"):
+                    async with tenants.use() as tenant:
+                        day_start = local_day_start()
+                        await tenant.luma_client.get_schedule(day_start, day_start + timedelta(days=1))
+                        if tenant.calendar_sync.enabled:
+                            await tenant.calendar_sync.wait_synced()
+            self.state = "done"
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e) or type(e).__name__
+            log_fields(logger, logging.WARNING, "warm-up failed, serving cold", error=self.error)
+        self.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        profile.log()
+
+    def status(self) -> dict:
+        return {"state": self.state, "duration_ms": self.duration_ms, "error": self.error}
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+def import_times(module: str = "main") -> List[Tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) for everything importing `module` pulls in, via -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return rows
+
+def _print_import_report(rows: List[Tuple[str, int, int]], top: int) -> None:
+    by_package = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    print(f"Import time by top-level package (total {sum(by_package.values()) / 1000:.1f} ms):")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {package:<28} {self_us / 1000:>8.1f} ms")
+    print("\nSlowest modules, including what they import:")
+    for name, _, cumulative_us in sorted(rows, key=lambda row: -row[2])[:top]:
+        print(f"  {name:<48} {cumulative_us / 1000:>8.1f} ms")
+
+async def _profile_app(warm_up: bool) -> Dict[str, float]:
+    # Run as a script this module is __main__, so read the profile the app itself writes to
+    from services.startup import profile as app_profile
+    import main
+
+    main.config.WARMUP_ON_START = warm_up
+    async with main.lifespan(main.app):
+        if warm_up:
+            while not main.warm_up.ready:
+                await asyncio.sleep(0.01)
+        else:
+            with app_profile.phase("first_tenant"):
+                main.tenants.get()
+    return app_profile.report()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report where worker startup time goes")
+    parser.add_argument("--top", type=int, default=15, help="rows per import table")
+    parser.add_argument("--warm-up", action="store_true", help="include the warm-up phase")
+    args = parser.parse_args()
+
+    _print_import_report(import_times("main"), args.top)
+    print("\nStartup phases (cold imports were measured above, these run with a warm module cache):")
+    for name, ms in asyncio.run(_profile_app(args.warm_up)).items():
+        print(f"  {name:<28} {ms:>8.1f} ms")
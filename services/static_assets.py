@@ -0,0 +1,173 @@
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # optional, gzip alone is still a big win
+    brotli = None
+
+# Already-compressed formats gain nothing from another pass
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+@dataclass(frozen=True)
+class Asset:
+    content_type: str
+    etag: str
+    # encoding ("identity", "gzip", "br") -> body
+    bodies: Dict[str, bytes]
+
+def _compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+def _build_asset(path: str, body: bytes) -> Asset:
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type == "application/javascript":
+        content_type += "; charset=utf-8"
+    bodies = {"identity": body}
+    if _compressible(content_type):
+        # Keep a variant only when it actually saves bytes
+        gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(gzipped) < len(body):
+            bodies["gzip"] = gzipped
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            if len(compressed) < len(body):
+                bodies["br"] = compressed
+    return Asset(content_type, f'"{hashlib.sha256(body).hexdigest()[:16]}"', bodies)
+
+def _fingerprinted(path: str, body: bytes) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.{hashlib.sha256(body).hexdigest()[:10]}{ext}"
+
+def accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}, ignoring codings the client refused with q=0"""
+    accepted = {}
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                continue
+        if q > 0:
+            accepted[coding.strip().lower()] = q
+    return accepted
+
+class StaticAssets:
+    """Fingerprinted, precompressed copies of the static directory, built once and served from memory
+
+    Every file is also reachable under a name with its content hash in it; those
+    URLs never change content, so browsers may keep them for a year. index.html is
+    rewritten to point at them, and is itself revalidated on every load.
+    """
+
+    def __init__(self, directory: str, prefix: str = "/static"):
+        self.directory = directory
+        self.prefix = prefix
+        # URL path relative to the prefix -> fingerprinted path, e.g. script.js -> script.1a2b3c4d5e.js
+        self.manifest: Dict[str, str] = {}
+        self._assets: Dict[str, Asset] = {}
+        self._immutable = set()
+        self.index: Optional[Asset] = None
+        self._build()
+
+    def _build(self) -> None:
+        files = {}
+        for root, _, names in os.walk(self.directory):
+            for name in sorted(names):
+                full_path = os.path.join(root, name)
+                relative = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+                with open(full_path, "rb") as f:
+                    files[relative] = f.read()
+
+        # Binary assets first, so the text that references them can point at their hashed names
+        order = sorted(files, key=lambda relative: _compressible(mimetypes.guess_type(relative)[0] or ""))
+        for relative in order:
+            if relative == "index.html":
+                continue
+            body = self._rewrite(relative, files[relative])
+            hashed = _fingerprinted(relative, body)
+            asset = _build_asset(relative, body)
+            self.manifest[relative] = hashed
+            self._assets[relative] = asset
+            self._assets[hashed] = asset
+            self._immutable.add(hashed)
+
+        if "index.html" in files:
+            self.index = _build_asset("index.html", self._rewrite("index.html", files["index.html"]))
+
+    def _rewrite(self, relative: str, body: bytes) -> bytes:
+        """Point references to other static files at their fingerprinted names"""
+        if not _compressible(mimetypes.guess_type(relative)[0] or "") or not self.manifest:
+            return body
+        text = body.decode("utf-8")
+        for original, hashed in self.manifest.items():
+            text = text.replace(f"{self.prefix}/{original}", f"{self.prefix}/{hashed}")
+        return text.encode("utf-8")
+
+    def get(self, relative: str) -> Optional[Asset]:
+        return self._assets.get(relative)
+
+    def is_immutable(self, relative: str) -> bool:
+        return relative in self._immutable
+
+    @staticmethod
+    def etag(asset: Asset, encoding: str) -> str:
+        """Strong ETag for one encoded representation of the asset"""
+        return asset.etag if encoding == "identity" else f'{asset.etag[:-1]}-{encoding}"'
+
+    @staticmethod
+    def negotiate(asset: Asset, accept_encoding: Optional[str]) -> str:
+        """Best encoding the client accepts and we have, preferring brotli, then gzip"""
+        accepted = accepted_encodings(accept_encoding)
+        candidates = [
+            coding for coding in ("br", "gzip")
+            if coding in asset.bodies and (coding in accepted or "*" in accepted)
+        ]
+        if not candidates:
+            return "identity"
+        return max(candidates, key=lambda coding: accepted.get(coding, accepted.get("*", 0)))
+
+    def export(self, out_dir: str) -> int:
+        """Write hashed files, their .gz/.br variants and manifest.json for a CDN or web server"""
+        os.makedirs(out_dir, exist_ok=True)
+        written = 0
+        suffixes = {"identity": "", "gzip": ".gz", "br": ".br"}
+        for hashed in sorted(self._immutable):
+            for coding, body in self._assets[hashed].bodies.items():
+                target = os.path.join(out_dir, hashed + suffixes[coding])
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "wb") as f:
+                    f.write(body)
+                written += 1
+        if self.index is not None:
+            for coding, body in self.index.bodies.items():
+                with open(os.path.join(out_dir, "index.html" + suffixes[coding]), "wb") as f:
+                    f.write(body)
+                written += 1
+        with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build fingerprinted, precompressed static assets")
+    parser.add_argument("--static-dir", default=os.path.join(os.path.dirname(os.path.dirname(__file__)), "static"))
+    parser.add_argument("--out", default="dist", help="directory to write the built assets to")
+    args = parser.parse_args()
+
+    assets = StaticAssets(args.static_dir)
+    written = assets.export(args.out)
+    print(f"Wrote {written} files for {len(assets.manifest)} assets to {args.out}"
+          f" (brotli {'on' if brotli is not None else 'off: pip install brotli'})")
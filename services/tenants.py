@@ -0,0 +1,233 @@
+import asyncio
+import copy
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from config import Config
+from services.calendar_sync import CalendarSync
+from services.conflict_checker import ConflictChecker
+from services.event_cache import CachedLumaClient
+from services.event_store import SQLiteEventStore
+from services.log import get_logger, log_fields, register_secret
+from services.luma_client import LumaClient
+from services.mock_luma_client import MockLumaClient
+from services.room_locks import RoomLockManager
+from services.room_registry import read_room_registry
+
+logger = get_logger("tenants")
+
+class UnknownTenant(KeyError):
+    pass
+
+def _tenant_path(path: str, tenant_id: str) -> str:
+    """Give each tenant its own SQLite file next to the configured one"""
+    if not path or path == ":memory:":
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{tenant_id}{ext}"
+
+def load_tenant_configs(config: Config) -> Dict[str, Config]:
+    """One Config per tenant: the default tenant from the environment, the rest from tenants.json
+
+    Each tenants.json entry may set "rooms" (a rooms.json path), "api_key_env" (the
+    environment variable holding its Luma key) and "base_url". SQLite files get the
+    tenant id appended so tenants never share locks or stores.
+    """
+    configs = {config.DEFAULT_TENANT: config}
+    if not os.path.exists(config.TENANTS_CONFIG_PATH):
+        return configs
+
+    with open(config.TENANTS_CONFIG_PATH) as f:
+        entries = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(config.TENANTS_CONFIG_PATH))
+    for tenant_id, entry in entries.items():
+        tenant_config = copy.copy(config)
+        if tenant_id != config.DEFAULT_TENANT:
+            for name in ("LOCAL_EVENT_STORE_PATH", "SYNC_STORE_PATH", "ROOM_LOCK_PATH"):
+                setattr(tenant_config, name, _tenant_path(getattr(config, name), tenant_id))
+        if "rooms" in entry:
+            tenant_config.ROOMS_PATH = os.path.join(base_dir, entry["rooms"])
+        if "api_key_env" in entry:
+            tenant_config.API_KEY = os.getenv(entry["api_key_env"])
+        if "base_url" in entry:
+            tenant_config.BASE_URL = entry["base_url"]
+        configs[tenant_id] = tenant_config
+    return configs
+
+class Tenant:
+    """Everything one community space needs: rooms, Luma client, caches, mirror and locks"""
+
+    def __init__(self, tenant_id: str, config: Config):
+        self.id = tenant_id
+        self.config = config
+        # Keys from api_key_env are only known here, so the log filter learns them now
+        register_secret(config.API_KEY)
+        self.room_registry = read_room_registry(config.ROOMS_PATH)
+
+        # SQLite files this tenant opened, closed again when it is evicted
+        self._stores = []
+
+        # Use mock client in debug mode
+        if config.DEBUG_MODE:
+            client = MockLumaClient(self._open_store(config.LOCAL_EVENT_STORE_PATH))
+        else:
+            client = LumaClient(config, registry=self.room_registry)
+
+        # Serve repeat lookups for the same day from memory
+        self.luma_client = CachedLumaClient(client, config)
+
+        # Keep a local mirror of upcoming events so conflict checks don't wait on Luma
+        self.calendar_sync = CalendarSync(
+            self.luma_client,
+            config,
+            store=self._open_store(config.SYNC_STORE_PATH) if config.SYNC_STORE_PATH else None
+        )
+        self.conflict_checker = ConflictChecker(config, self.room_registry)
+
+        # Per-room booking locks, shared across workers with ROOM_LOCK_BACKEND=sqlite
+        self.room_locks = RoomLockManager(config, self.conflict_checker)
+
+        self.last_used = time.monotonic()
+        self.in_use = 0
+
+    def _open_store(self, path: str) -> SQLiteEventStore:
+        store = SQLiteEventStore(path)
+        self._stores.append(store)
+        return store
+
+    def start(self) -> None:
+        self.calendar_sync.start()
+
+    async def aclose(self) -> None:
+        # Stopping the sync also flushes its pending store writes
+        await self.calendar_sync.stop()
+        # Release pooled upstream connections
+        await self.luma_client.aclose()
+        # Room leases need nothing here, they open a connection per operation
+        for store in self._stores:
+            store.close()
+
+class TenantPool:
+    """Builds tenants on first use and drops them again once they sit idle"""
+
+    def __init__(self, config: Config):
+        self.default_tenant = config.DEFAULT_TENANT
+        self.idle_seconds = config.TENANT_IDLE_SECONDS
+        self.max_active = config.TENANT_MAX_ACTIVE
+        self.configs = load_tenant_configs(config)
+        self._tenants: Dict[str, Tenant] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self._closing = set()
+        self.evictions = 0
+
+    def __iter__(self):
+        return iter(list(self._tenants.values()))
+
+    def get(self, tenant_id: Optional[str] = None) -> Tenant:
+        """The tenant's state, building it if this is its first request since it went idle"""
+        tenant_id = tenant_id or self.default_tenant
+        tenant = self._tenants.get(tenant_id)
+        if tenant is None:
+            if tenant_id not in self.configs:
+                raise UnknownTenant(tenant_id)
+            # Nothing here awaits, so two first requests can't both build the tenant
+            tenant = self._tenants[tenant_id] = Tenant(tenant_id, self.configs[tenant_id])
+            tenant.start()
+            log_fields(logger, logging.INFO, "tenant started", tenant=tenant_id, active=len(self._tenants))
+            self._evict_over_capacity(keep=tenant)
+        tenant.last_used = time.monotonic()
+        return tenant
+
+    @asynccontextmanager
+    async def use(self, tenant_id: Optional[str] = None) -> AsyncIterator[Tenant]:
+        """Hold a tenant for the length of a request so it isn't evicted underneath it"""
+        tenant = self.get(tenant_id)
+        tenant.in_use += 1
+        try:
+            yield tenant
+        finally:
+            tenant.in_use -= 1
+            tenant.last_used = time.monotonic()
+
+    def check_rooms(self) -> int:
+        """Log suspicious conflicts_with entries in every tenant's rooms file, returning how many"""
+        found = 0
+        for tenant_id, tenant_config in self.configs.items():
+            for kind, message in read_room_registry(tenant_config.ROOMS_PATH).conflict_problems:
+                log_fields(
+                    logger, logging.WARNING, "rooms config problem",
+                    tenant=tenant_id, path=tenant_config.ROOMS_PATH, kind=kind, problem=message
+                )
+                found += 1
+        return found
+
+    def start(self) -> None:
+        """Start evicting idle tenants in the background"""
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap())
+
+    async def aclose(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+        tenants, self._tenants = list(self._tenants.values()), {}
+        for tenant in tenants:
+            await tenant.aclose()
+
+    async def evict_idle(self) -> None:
+        """Close tenants nobody has used for TENANT_IDLE_SECONDS"""
+        now = time.monotonic()
+        for tenant in list(self._tenants.values()):
+            if tenant.in_use == 0 and now - tenant.last_used > self.idle_seconds:
+                await self._evict(tenant)
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        return {
+            "active": {
+                tenant.id: {"idle_seconds": round(now - tenant.last_used, 1), "in_use": tenant.in_use}
+                for tenant in self._tenants.values()
+            },
+            "configured": sorted(self.configs),
+            "evictions": self.evictions
+        }
+
+    async def _reap(self) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, min(self.idle_seconds / 4, 60.0)))
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                log_fields(logger, logging.WARNING, "tenant eviction failed", error=str(e))
+
+    def _evict_over_capacity(self, keep: Tenant) -> None:
+        # Past the cap, the least recently used idle tenants go first
+        idle = sorted(
+            (tenant for tenant in self._tenants.values() if tenant.in_use == 0 and tenant is not keep),
+            key=lambda tenant: tenant.last_used
+        )
+        for tenant in idle[:max(0, len(self._tenants) - self.max_active)]:
+            self._detach(tenant)
+            task = asyncio.create_task(tenant.aclose())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def _evict(self, tenant: Tenant) -> None:
+        if self._detach(tenant):
+            await tenant.aclose()
+
+    def _detach(self, tenant: Tenant) -> bool:
+        # Unlisted right away, so no new request picks up a tenant that is closing
+        if self._tenants.get(tenant.id) is not tenant:
+            return False
+        del self._tenants[tenant.id]
+        self.evictions += 1
+        log_fields(logger, logging.INFO, "tenant evicted", tenant=tenant.id, active=len(self._tenants))
+        return True
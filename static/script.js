@@ -1,4 +1,8 @@
 document.addEventListener('DOMContentLoaded', function() {
+    // Pass ?tenant= from the page URL on to every API call so they all hit the same space
+    const tenant = new URLSearchParams(window.location.search).get('tenant');
+    const tenantHeaders = tenant ? { 'X-Tenant': tenant } : {};
+
     // Initialize datetime pickers
     const commonConfig = {
         enableTime: true,
@@ -21,6 +25,28 @@ document.addEventListener('DOMContentLoaded', function() {
         return /^[^\s@]+@[^\s@]+\.[^\s@]+$/.test(email);
     }
 
+    // crypto.randomUUID only exists on https and localhost; plain-http LAN setups get the fallback
+    function newIdempotencyKey() {
+        if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+        const bytes = new Uint8Array(16);
+        if (window.crypto && crypto.getRandomValues) {
+            crypto.getRandomValues(bytes);
+        } else {
+            for (let i = 0; i < bytes.length; i++) bytes[i] = Math.floor(Math.random() * 256);
+        }
+        return Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+    }
+
+    // Key of a submission that hasn't had a definitive answer yet, with the body it was sent with
+    let pendingSubmission = null;
+
+    // For anything typed by users or echoed back by Luma that ends up in innerHTML
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text == null ? '' : String(text);
+        return div.innerHTML.replace(/"/g, '&quot;');
+    }
+
     function addEmail(email) {
         if (!email || !isValidEmail(email) || hostEmails.has(email)) return false;
         
@@ -29,7 +55,7 @@ document.addEventListener('DOMContentLoaded', function() {
         emailItem.className = 'email-item';
         emailItem.innerHTML = `
             <span class="email-check">✓</span>
-            <span class="email-text">${email}</span>
+            <span class="email-text">${escapeHtml(email)}</span>
             <button type="button" class="remove-email" aria-label="Remove email">×</button>
         `;
 
@@ -173,7 +199,7 @@ document.addEventListener('DOMContentLoaded', function() {
     // Populate locations dropdown
     const locationSelect = document.getElementById('location');
     
-    fetch('/locations')
+    fetch('/locations', { headers: tenantHeaders })
         .then(response => response.json())
         .then(rooms => {
             // Add default option
@@ -222,7 +248,7 @@ document.addEventListener('DOMContentLoaded', function() {
         });
 
     // Check API status
-    fetch('/health')
+    fetch('/health', { headers: tenantHeaders })
         .then(response => response.json())
         .then(health => {
             if (health.debug_mode) {
@@ -236,6 +262,35 @@ document.addEventListener('DOMContentLoaded', function() {
             document.getElementById('api-status').classList.remove('hidden');
         });
 
+    // Ask the server for open slots in the same space on the same day instead of guessing
+    async function freeSlotSuggestions(eventData) {
+        const start = new Date(eventData.start_time);
+        const dayStart = new Date(start);
+        dayStart.setHours(0, 0, 0, 0);
+        const dayEnd = new Date(dayStart);
+        dayEnd.setDate(dayEnd.getDate() + 1);
+        const params = new URLSearchParams({
+            start: dayStart.toISOString(),
+            end: dayEnd.toISOString(),
+            duration_minutes: Math.round((new Date(eventData.end_time) - start) / 60000),
+            room: eventData.location
+        });
+
+        try {
+            const response = await fetch(`/availability?${params}`, { headers: tenantHeaders });
+            if (!response.ok) return '';
+            const availability = await response.json();
+            const slots = (availability.rooms[0] || {}).free || [];
+            if (slots.length === 0) return '';
+            const slotList = slots.slice(0, 3).map(slot =>
+                `• ${new Date(slot.start).toLocaleTimeString()} - ${new Date(slot.end).toLocaleTimeString()}`
+            ).join('<br>');
+            return `<br><br>Open times in ${escapeHtml(eventData.location)} that day:<br>${slotList}`;
+        } catch (error) {
+            return '';
+        }
+    }
+
     const form = document.getElementById('event-form');
     const result = document.getElementById('result');
 
@@ -272,22 +327,44 @@ document.addEventListener('DOMContentLoaded', function() {
             additional_hosts: Array.from(hostEmails).slice(1) // Additional hosts
         };
 
+        // Re-submitting the same form after a timeout or network error reuses its key, so the
+        // server replays the first outcome instead of booking twice
+        const body = JSON.stringify(eventData);
+        if (!pendingSubmission || pendingSubmission.body !== body) {
+            pendingSubmission = { body, key: newIdempotencyKey() };
+        }
+        const idempotencyKey = pendingSubmission.key;
+
         try {
             const response = await fetch('/events/create', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    // Lets the server recognize a repeated submission of this same form
+                    'Idempotency-Key': idempotencyKey,
+                    ...tenantHeaders,
                 },
-                body: JSON.stringify(eventData)
+                body
             });
 
+            // Created, conflicting or rejected are final answers; only those start a new key
+            if (response.ok || response.status === 409 || response.status === 422) {
+                pendingSubmission = null;
+            }
             const data = await response.json();
 
             if (response.ok) {
+                // Co-hosts Luma refused are reported per email, the event itself still exists
+                const failedHosts = (data.hosts || []).filter(host => host.status !== 'added');
+                const hostWarning = failedHosts.length
+                    ? `<div class="description-warning">Could not add ${failedHosts.map(host => escapeHtml(host.email)).join(', ')} as host${failedHosts.length > 1 ? 's' : ''} - add them on Luma instead.</div>`
+                    : '';
+
                 // Fetch the event details to get the public URL
                 const eventDetailsResponse = await fetch(`/events/${data.event_id}`, {
                     headers: {
                         'Content-Type': 'application/json',
+                        ...tenantHeaders,
                     }
                 });
                 
@@ -300,19 +377,20 @@ document.addEventListener('DOMContentLoaded', function() {
                         result.innerHTML = `
                             Event created successfully!<br>
                             <div class="description-warning">Make sure to update your description! :)</div>
-                            <a href="${eventDetails.url}" target="_blank" class="event-link">
+                            ${hostWarning}
+                            <a href="${escapeHtml(eventDetails.url)}" target="_blank" class="event-link">
                                 View Event on Luma
                                 <span class="external-link-icon">↗</span>
                             </a>
                         `;
                     } else {
-                        result.textContent = 'Event created successfully! Check your email for the event link and remember to update your description! :)';
+                        result.innerHTML = `Event created successfully! Check your email for the event link and remember to update your description! :)${hostWarning}`;
                     }
                 } else {
                     // Fallback to showing just the success message if we can't get the URL
                     console.log('Failed to get event details:', await eventDetailsResponse.text());  // Debug log
                     result.className = 'success';
-                    result.textContent = 'Event created successfully! Check your email for the event link.';
+                    result.innerHTML = `Event created successfully! Check your email for the event link.${hostWarning}`;
                 }
                 
                 form.reset();
@@ -324,10 +402,11 @@ document.addEventListener('DOMContentLoaded', function() {
                     // Format conflict details
                     const conflicts = data.conflicts || [];
                     const conflictDetails = conflicts.map(conflict => 
-                        `• ${conflict.name} (${new Date(conflict.start_time).toLocaleTimeString()} - ${new Date(conflict.end_time).toLocaleTimeString()})`
+                        `• ${escapeHtml(conflict.name)} (${new Date(conflict.start_time).toLocaleTimeString()} - ${new Date(conflict.end_time).toLocaleTimeString()})`
                     ).join('\n');
                     
                     result.innerHTML = `Cannot create event due to conflicts:<br>${conflictDetails || 'Time slot is already booked'}`;
+                    result.innerHTML += await freeSlotSuggestions(eventData);
                 } else {
                     result.textContent = data.detail || 'Failed to create event';
                 }
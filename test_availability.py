@@ -0,0 +1,82 @@
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from app_testing import AppTestCase
+from models.event import Event
+from services.availability import free_slots, room_availability
+from services.room_registry import load_room_registry
+from services.room_schedule import RoomScheduleIndex
+
+DAY = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+def at(hour):
+    return DAY + timedelta(hours=hour)
+
+class TestFreeSlots(unittest.TestCase):
+    def test_overlapping_busy_intervals_are_merged(self):
+        busy = [(at(9), at(11)), (at(10), at(12)), (at(11.5), at(13)), (at(15), at(16))]
+        self.assertEqual(
+            free_slots(busy, at(8), at(18), timedelta(hours=1)),
+            [(at(8), at(9)), (at(13), at(15)), (at(16), at(18))]
+        )
+
+    def test_gaps_shorter_than_duration_are_skipped(self):
+        busy = [(at(9), at(10)), (at(10.5), at(12))]
+        self.assertEqual(
+            free_slots(busy, at(9), at(13), timedelta(hours=1)),
+            [(at(12), at(13))]
+        )
+
+class TestRoomAvailability(unittest.TestCase):
+    def setUp(self):
+        self.registry = load_room_registry()
+        self.schedule = RoomScheduleIndex([
+            Event(name="Yoga", start_time=at(9), end_time=at(10), location="North Studio"),
+            Event(name="Salsa", start_time=at(12), end_time=at(13), location="South Studio"),
+        ])
+
+    def slots_for(self, room_name, buffer_minutes=0):
+        [room] = room_availability(
+            self.registry, self.schedule, [self.registry.by_name[room_name]],
+            at(8), at(14), timedelta(minutes=30), buffer_minutes
+        )
+        return [(slot["start"], slot["end"]) for slot in room["free"]]
+
+    def test_conflicting_rooms_block_each_other(self):
+        self.assertEqual(self.slots_for("Full Studio"), [
+            (at(8).isoformat(), at(9).isoformat()),
+            (at(10).isoformat(), at(12).isoformat()),
+            (at(13).isoformat(), at(14).isoformat()),
+        ])
+        # North and South only conflict with the full studio, not each other
+        self.assertEqual(self.slots_for("South Studio"), [
+            (at(8).isoformat(), at(12).isoformat()),
+            (at(13).isoformat(), at(14).isoformat()),
+        ])
+
+    def test_buffer_shrinks_the_gaps(self):
+        self.assertEqual(self.slots_for("North Studio", buffer_minutes=30), [
+            (at(8).isoformat(), at(8.5).isoformat()),
+            (at(10.5).isoformat(), at(14).isoformat()),
+        ])
+
+class TestAvailabilityRoute(AppTestCase):
+    async def test_naive_dates_and_times_are_local(self):
+        tomorrow = date.today() + timedelta(days=1)
+        ranges = {
+            "plain dates": (tomorrow.isoformat(), (tomorrow + timedelta(days=1)).isoformat()),
+            "naive times": (f"{tomorrow}T09:00:00", f"{tomorrow}T17:00:00"),
+        }
+        for kind, (start, end) in ranges.items():
+            response = await self.client.get("/availability", params={"start": start, "end": end, "room": "library"})
+            self.assertEqual(response.status_code, 200, f"{kind}: {response.text}")
+            self.assertTrue(response.json()["rooms"][0]["free"])
+        # Times without an offset are read as the space's local time
+        self.assertTrue(response.json()["start"].endswith(("-07:00", "-08:00")))
+
+class TestAvailabilityRouteSynced(TestAvailabilityRoute):
+    """The same checks once the mirror answers instead of the client"""
+
+    config = {"CALENDAR_SYNC_ENABLED": True}
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+from app_testing import AppTestCase
+from models.event_columns import EventColumns
+
+DAY = datetime.now(timezone.utc).replace(hour=17, minute=0, second=0, microsecond=0) + timedelta(days=5)
+
+def booking(name, location, start_hour, end_hour, day=0):
+    start = DAY + timedelta(days=day)
+    return {
+        "name": name,
+        "start_time": (start + timedelta(hours=start_hour)).isoformat(),
+        "end_time": (start + timedelta(hours=end_hour)).isoformat(),
+        "location": location,
+        "host_email": "host@example.com"
+    }
+
+class TestBatchCreate(AppTestCase):
+    config = {"BATCH_MAX_EVENTS": 5, "BATCH_CREATE_CONCURRENCY": 3}
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.luma = self.tenant.luma_client
+
+    async def batch(self, *events):
+        return await self.client.post("/events/batch", json={"events": list(events)})
+
+    async def test_later_items_conflict_with_earlier_accepted_ones(self):
+        response = await self.batch(
+            booking("Yoga", "North Studio", 1, 2),
+            booking("Full Jam", "Full Studio", 1.5, 3),
+            booking("Stretch", "South Studio", 1, 2),
+            booking("Yoga again", "North Studio", 1, 2, day=1),
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(
+            [result["status"] for result in body["results"]],
+            ["created", "conflict", "created", "created"]
+        )
+        self.assertEqual(body["results"][1]["conflicts"][0]["name"], "Yoga")
+        self.assertEqual(body["created"], 3)
+
+    async def test_existing_bookings_are_checked_across_days(self):
+        first = await self.client.post("/events/create", json=booking("Book Club", "Library", 2, 4, day=2))
+        self.assertEqual(first.status_code, 200)
+        body = (await self.batch(
+            booking("Reading", "Library", 3, 5, day=2),
+            booking("Reading", "Library", 3, 5, day=3),
+        )).json()
+        self.assertEqual([result["status"] for result in body["results"]], ["conflict", "created"])
+
+    async def test_partial_failure_keeps_results_in_request_order(self):
+        create = self.luma.create_event
+
+        async def flaky_create(event):
+            # Earlier items finish last, so results land out of order unless placed by index
+            await asyncio.sleep({"A": 0.03, "B": 0.02, "C": 0.01}.get(event.name[0], 0))
+            if event.name.startswith("B"):
+                raise RuntimeError("luma said no")
+            return await create(event)
+
+        with mock.patch.object(self.luma, "create_event", side_effect=flaky_create):
+            body = (await self.batch(
+                booking("A talk", "Library", 1, 2, day=4),
+                booking("B talk", "Astrology Lounge", 1, 2, day=4),
+                booking("C talk", "540 Cafe", 1, 2, day=4),
+            )).json()
+        self.assertEqual([result["index"] for result in body["results"]], [0, 1, 2])
+        self.assertEqual(
+            [result["status"] for result in body["results"]], ["created", "failed", "created"]
+        )
+        self.assertEqual(body["results"][1]["error"], "luma said no")
+        self.assertEqual(body["created"], 2)
+
+        # The failed item was never recorded, so its slot is still free
+        retry = (await self.batch(booking("B talk", "Astrology Lounge", 1, 2, day=4))).json()
+        self.assertEqual(retry["results"][0]["status"], "created")
+
+    async def test_oversized_batch_is_refused(self):
+        response = await self.batch(*(booking(f"Talk {i}", "Library", i, i + 1, day=6) for i in range(6)))
+        self.assertEqual(response.status_code, 400)
+
+class TestBatchCreateSynced(TestBatchCreate):
+    """The same batches checked against the mirror, which must not be walked row by row"""
+
+    config = {**TestBatchCreate.config, "CALENDAR_SYNC_ENABLED": True}
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        walk = mock.patch.object(EventColumns, "__iter__", side_effect=AssertionError("walked the mirror"))
+        walk.start()
+        self.addCleanup(walk.stop)
+
+if __name__ == '__main__':
+    unittest.main()
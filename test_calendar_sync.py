@@ -0,0 +1,140 @@
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from app_testing import AppTestCase
+from config import Config
+from models.event import Event
+from services.calendar_sync import CalendarSync
+from services.event_store import SQLiteEventStore
+from services.room_schedule import RoomScheduleIndex
+
+TOMORROW = datetime.now(timezone.utc).replace(hour=17, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+def _event(event_id, hours=0, location="North Studio"):
+    start = TOMORROW + timedelta(hours=hours)
+    return Event(name=event_id, start_time=start, end_time=start + timedelta(hours=1),
+                 location=location, event_id=event_id)
+
+class PagedClient:
+    """Serves its events in fixed-size pages, with a hook that runs between pages"""
+
+    def __init__(self, events, page_size=2):
+        self.events = list(events)
+        self.page_size = page_size
+        self.between_pages = None
+        self.schedule_calls = 0
+
+    async def list_events_page(self, start_date, end_date, cursor=None):
+        offset = int(cursor or 0)
+        if offset and self.between_pages:
+            self.between_pages()
+        page = self.events[offset:offset + self.page_size]
+        more = offset + self.page_size < len(self.events)
+        return page, str(offset + self.page_size) if more else None
+
+    async def get_schedule(self, start_date, end_date):
+        self.schedule_calls += 1
+        return RoomScheduleIndex()
+
+class TestCalendarSync(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.config = Config()
+        self.config.DEBUG_MODE = True
+        self.config.CALENDAR_SYNC_ENABLED = True
+        self.config.SYNC_WINDOW_DAYS = 7
+        self.config.SYNC_INTERVAL_SECONDS = 60
+        self.client = PagedClient([_event(f"evt-{i}", hours=i) for i in range(5)])
+        self.sync = CalendarSync(self.client, self.config)
+
+    async def test_pages_are_merged_into_one_index(self):
+        await self.sync.sync_once()
+        self.assertEqual(self.sync.pages_fetched, 3)
+        schedule = await self.sync.get_schedule(TOMORROW, TOMORROW + timedelta(days=1))
+        self.assertEqual(len(schedule), 5)
+        self.assertEqual(self.client.schedule_calls, 0)
+
+    async def test_events_gone_upstream_are_pruned(self):
+        await self.sync.sync_once()
+        version = self.sync.version
+        del self.client.events[1]
+        await self.sync.sync_once()
+        schedule = await self.sync.get_schedule(TOMORROW, TOMORROW + timedelta(days=1))
+        self.assertNotIn("evt-1", {event.event_id for event in schedule})
+        self.assertGreater(self.sync.version, version)
+
+    async def test_events_edited_upstream_are_replaced(self):
+        await self.sync.sync_once()
+        version = self.sync.version
+        self.client.events[2] = _event("evt-2", hours=8)
+        self.client.events[2].name = "Moved"
+        await self.sync.sync_once()
+        schedule = await self.sync.get_schedule(TOMORROW, TOMORROW + timedelta(days=1))
+        self.assertEqual(len(schedule), 5)
+        moved = [row for row in schedule if row.event_id == "evt-2"]
+        self.assertEqual([(row.name, row.start_time) for row in moved], [("Moved", TOMORROW + timedelta(hours=8))])
+        self.assertGreater(self.sync.version, version)
+
+    async def test_unchanged_pass_keeps_version(self):
+        await self.sync.sync_once()
+        version = self.sync.version
+        await self.sync.sync_once()
+        self.assertEqual(self.sync.version, version)
+
+    async def test_booking_recorded_mid_pass_survives_the_prune(self):
+        await self.sync.sync_once()
+        booked = _event("evt-new", hours=10)
+        self.client.between_pages = lambda: self.sync.record(booked)
+        await self.sync.sync_once()
+        schedule = await self.sync.get_schedule(TOMORROW, TOMORROW + timedelta(days=1))
+        self.assertIn("evt-new", {event.event_id for event in schedule})
+
+    async def test_recorded_bookings_reach_the_store_after_a_concurrent_pass(self):
+        store = SQLiteEventStore()
+        self.addCleanup(store.close)
+        sync = CalendarSync(self.client, self.config, store=store)
+        await sync.sync_once()
+        booked = _event("evt-new", hours=10)
+        self.client.between_pages = lambda: sync.record(booked)
+        await sync.sync_once()
+        await sync.stop()
+        self.assertIsNotNone(store.get("evt-new"))
+        self.assertEqual(len(store), 6)
+
+    async def test_stale_or_narrow_mirror_falls_back_to_client(self):
+        day = (TOMORROW, TOMORROW + timedelta(days=1))
+        self.assertFalse(self.sync.covers(*day))
+        await self.sync.get_schedule(*day)
+        self.assertEqual(self.client.schedule_calls, 1)
+
+        await self.sync.sync_once()
+        self.assertTrue(self.sync.covers(*day))
+        self.assertFalse(self.sync.covers(TOMORROW, TOMORROW + timedelta(days=30)))
+
+        self.sync.last_sync -= timedelta(seconds=self.config.SYNC_INTERVAL_SECONDS * 4)
+        self.assertFalse(self.sync.covers(*day))
+        await self.sync.get_schedule(*day)
+        self.assertEqual(self.client.schedule_calls, 2)
+
+class TestBookingRoutes(AppTestCase):
+    async def test_naive_times_are_read_as_local_time(self):
+        day = date.today() + timedelta(days=2)
+        created = await self.client.post("/events/create", json={
+            "name": "Naive talk", "start_time": f"{day}T10:00:00", "end_time": f"{day}T11:00:00",
+            "location": "Library", "host_email": "host@example.com"
+        })
+        self.assertEqual(created.status_code, 200, created.text)
+        batch = await self.client.post("/events/batch", json={"events": [
+            {"name": "Naive clash", "start_time": f"{day}T10:30:00", "end_time": f"{day}T11:30:00",
+             "location": "Library", "host_email": "host@example.com"},
+            {"name": "Naive later", "start_time": f"{day}T12:00:00", "end_time": f"{day}T13:00:00",
+             "location": "Library", "host_email": "host@example.com"},
+        ]})
+        self.assertEqual(batch.status_code, 200, batch.text)
+        self.assertEqual([result["status"] for result in batch.json()["results"]], ["conflict", "created"])
+
+class TestBookingRoutesSynced(TestBookingRoutes):
+    """The same bookings once they are checked against the mirror's aware window"""
+
+    config = {"CALENDAR_SYNC_ENABLED": True}
+
+if __name__ == '__main__':
+    unittest.main()
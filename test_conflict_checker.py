@@ -0,0 +1,113 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from config import Config
+from models.event import Event
+from services.conflict_checker import ConflictChecker
+from services.room_registry import RoomRegistry, load_room_registry
+
+def make_event(name, location, start_hour, end_hour):
+    day = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    return Event(
+        name=name,
+        start_time=day + timedelta(hours=start_hour),
+        end_time=day + timedelta(hours=end_hour),
+        location=location
+    )
+
+class TestConflictChecker(unittest.TestCase):
+    def setUp(self):
+        self.config = Config()
+        self.config.DEFAULT_BUFFER_MINUTES = 0
+        self.checker = ConflictChecker(self.config)
+        self.existing = [
+            make_event("Yoga", "North Studio", 9, 10),
+            make_event("Dance Party", "Full Studio", 20, 23),
+            make_event("Book Club", "Library", 9, 11),
+            make_event("Retreat", "Hogwarts Hall", 0, 12),
+        ]
+        self.index = self.checker.build_index(self.existing)
+        self.columns = self.checker.build_columns(self.existing)
+
+    def assertSameConflicts(self, new_event, expected_names):
+        from_list = self.checker.find_conflicts(new_event, self.existing)
+        from_index = self.checker.find_conflicts(new_event, self.index)
+        from_columns = self.checker.find_conflicts(new_event, self.columns)
+        self.assertEqual(sorted(e.name for e in from_list), sorted(expected_names))
+        self.assertEqual(sorted(e.name for e in from_index), sorted(expected_names))
+        self.assertEqual(sorted(e.name for e in from_columns), sorted(expected_names))
+
+    def test_same_room_overlap(self):
+        self.assertSameConflicts(make_event("Reading", "Library", 10, 12), ["Book Club"])
+
+    def test_back_to_back_events_do_not_conflict(self):
+        self.assertSameConflicts(make_event("Reading", "Library", 11, 12), [])
+
+    def test_conflicts_with_is_applied_both_ways(self):
+        self.assertSameConflicts(make_event("Full Yoga", "Full Studio", 9, 10), ["Yoga"])
+        self.assertSameConflicts(make_event("Salsa", "South Studio", 21, 22), ["Dance Party"])
+        self.assertSameConflicts(make_event("Stretch", "South Studio", 9, 10), [])
+
+    def test_long_events_are_found_from_later_starts(self):
+        self.assertSameConflicts(make_event("Hackathon", "Hogwarts Hall", 11, 13), ["Retreat"])
+
+    def test_buffer_widens_the_window(self):
+        self.config.DEFAULT_BUFFER_MINUTES = 30
+        checker = ConflictChecker(self.config)
+        new_event = make_event("Reading", "Library", 11.25, 12)
+        self.assertEqual([e.name for e in checker.find_conflicts(new_event, self.index)], ["Book Club"])
+
+    def test_index_accepts_new_events(self):
+        new_event = make_event("Jam", "South Studio", 15, 16)
+        self.index.add(new_event)
+        conflicts = self.checker.find_conflicts(make_event("Big Jam", "Full Studio", 15.5, 17), self.index)
+        self.assertEqual([e.name for e in conflicts], ["Jam"])
+
+    def test_columns_accept_new_events_out_of_order(self):
+        self.columns.add(make_event("Early Jam", "South Studio", 1, 2))
+        conflicts = self.checker.find_conflicts(make_event("Big Jam", "Full Studio", 1.5, 3), self.columns)
+        self.assertEqual([e.name for e in conflicts], ["Early Jam"])
+        day = make_event("Day", "Anywhere", 0, 24)
+        whole_day = self.columns.overlapping(
+            ["North Studio", "South Studio", "Full Studio"], day.start_time, day.end_time
+        )
+        self.assertEqual([row.name for row in whole_day], ["Early Jam", "Yoga", "Dance Party"])
+
+    def test_column_rows_round_trip_to_events(self):
+        self.assertEqual(
+            sorted((e.name, e.start_time, e.end_time, e.location) for e in self.columns.to_events()),
+            sorted((e.name, e.start_time, e.end_time, e.location) for e in self.existing)
+        )
+        self.assertEqual(len(self.columns.rooms), len({e.location for e in self.existing}))
+        row = self.columns.row(0)
+        self.assertIs(row.start_time, row.start_time)
+
+class TestRoomConflictMatrix(unittest.TestCase):
+    def test_relation_is_symmetric_but_not_transitive(self):
+        registry = load_room_registry()
+        self.assertTrue(registry.rooms_conflict("Full Studio", "North Studio"))
+        self.assertTrue(registry.rooms_conflict("South Studio", "Full Studio"))
+        self.assertTrue(registry.rooms_conflict("Library", "Library"))
+        self.assertFalse(registry.rooms_conflict("North Studio", "South Studio"))
+        self.assertFalse(registry.rooms_conflict("Library", "540 Cafe"))
+
+    def test_unknown_locations_fall_back_to_names(self):
+        registry = load_room_registry()
+        self.assertTrue(registry.rooms_conflict("Rooftop", "Rooftop"))
+        self.assertFalse(registry.rooms_conflict("Rooftop", "Library"))
+
+    def test_validation_reports_one_sided_and_dangling_entries(self):
+        registry = RoomRegistry({
+            "buildings": {"1": {"address": "1 Main St", "rooms": [
+                {"id": "a", "name": "A", "description": "", "conflicts_with": ["B", "Attic"]},
+                {"id": "b", "name": "B", "description": ""},
+            ]}},
+            "coordinates": {"latitude": "0", "longitude": "0"}
+        })
+        self.assertEqual(
+            sorted(kind for kind, _ in registry.conflict_problems), ["asymmetric", "dangling"]
+        )
+        # One-sided entries still apply both ways
+        self.assertTrue(registry.rooms_conflict("B", "A"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+import httpx
+from app_testing import AppTestCase
+from config import Config
+from fake_luma import FakeLuma
+from models.event import Event
+from services.event_cache import CachedLumaClient
+from services.luma_client import LumaClient
+
+class FakeLumaClient:
+    def __init__(self, events):
+        self.events = events
+        self.get_calls = 0
+        self.event_calls = 0
+
+    async def get_event(self, event_id):
+        self.event_calls += 1
+        return next(e for e in self.events if e.event_id == event_id)
+
+    async def get_events(self, start_date, end_date):
+        self.get_calls += 1
+        return [e for e in self.events if start_date <= e.start_time < end_date]
+
+    async def create_event(self, event):
+        return "evt_new"
+
+class SlowLumaClient(FakeLumaClient):
+    """Answers with the events as they were when the call started"""
+
+    async def get_events(self, start_date, end_date):
+        events = await super().get_events(start_date, end_date)
+        await asyncio.sleep(0.02)
+        return events
+
+class TestCachedLumaClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.config = Config()
+        self.config.EVENT_CACHE_TTL_SECONDS = 60
+        self.config.EVENT_CACHE_MAX_DAYS = 2
+        self.day = datetime(2025, 3, 1, tzinfo=timezone.utc)
+        self.upstream = FakeLumaClient([
+            Event(
+                name="Writing Club",
+                start_time=self.day + timedelta(hours=10),
+                end_time=self.day + timedelta(hours=11),
+                location="Library",
+                event_id="evt_1",
+                url="https://lu.ma/evt_1"
+            )
+        ])
+        self.client = CachedLumaClient(self.upstream, self.config)
+
+    async def test_repeat_day_is_served_from_memory(self):
+        first = await self.client.get_events(self.day, self.day + timedelta(days=1))
+        second = await self.client.get_events(self.day, self.day + timedelta(days=1))
+        self.assertEqual(first, second)
+        self.assertEqual(self.upstream.get_calls, 1)
+        self.assertEqual(self.client.stats()["hits"], 1)
+        self.assertEqual(self.client.stats()["misses"], 1)
+
+    async def test_expired_day_is_refetched(self):
+        self.config.EVENT_CACHE_TTL_SECONDS = 0
+        client = CachedLumaClient(self.upstream, self.config)
+        await client.get_events(self.day, self.day + timedelta(days=1))
+        await client.get_events(self.day, self.day + timedelta(days=1))
+        self.assertEqual(self.upstream.get_calls, 2)
+        self.assertEqual(client.stats()["stale"], 1)
+
+    async def test_least_recently_used_day_is_evicted(self):
+        for offset in range(3):
+            day = self.day + timedelta(days=offset)
+            await self.client.get_events(day, day + timedelta(days=1))
+        self.assertEqual(self.client.stats()["days"], 2)
+        self.assertEqual(self.client.stats()["evictions"], 1)
+        await self.client.get_events(self.day, self.day + timedelta(days=1))
+        self.assertEqual(self.upstream.get_calls, 4)
+
+    async def test_created_event_is_written_through(self):
+        await self.client.get_events(self.day, self.day + timedelta(days=1))
+        new_event = Event(
+            name="Board Games",
+            start_time=self.day + timedelta(hours=18),
+            end_time=self.day + timedelta(hours=20),
+            location="540 Cafe"
+        )
+        self.assertEqual(await self.client.create_event(new_event), "evt_new")
+        events = await self.client.get_events(self.day, self.day + timedelta(days=1))
+        self.assertEqual([e.event_id for e in events], ["evt_1", "evt_new"])
+        self.assertEqual(self.upstream.get_calls, 1)
+
+    async def test_repeat_event_lookup_is_served_from_memory(self):
+        first = await self.client.get_event("evt_1")
+        second = await self.client.get_event("evt_1")
+        self.assertIs(first, second)
+        self.assertEqual(self.upstream.event_calls, 1)
+        self.assertEqual(self.client.stats()["event_hits"], 1)
+
+    async def test_events_without_url_are_not_cached(self):
+        self.upstream.events[0].url = None
+        await self.client.get_event("evt_1")
+        await self.client.get_event("evt_1")
+        self.assertEqual(self.upstream.event_calls, 2)
+
+    async def test_least_recently_used_event_is_evicted(self):
+        self.config.EVENT_CACHE_MAX_EVENTS = 1
+        client = CachedLumaClient(self.upstream, self.config)
+        for event_id in ("evt_1", "evt_2"):
+            client.remember(Event(
+                name=event_id, start_time=self.day, end_time=self.day, location="Library",
+                event_id=event_id, url=f"https://lu.ma/{event_id}"
+            ))
+        await client.get_event("evt_1")
+        self.assertEqual(self.upstream.event_calls, 1)
+        self.assertEqual(client.stats()["events"], 1)
+
+    async def test_refresh_does_not_join_a_fetch_that_started_earlier(self):
+        upstream = SlowLumaClient(list(self.upstream.events))
+        client = CachedLumaClient(upstream, self.config)
+        day_end = self.day + timedelta(days=1)
+        # Another room's booking in this worker is already fetching the day...
+        earlier = asyncio.create_task(client.get_schedule(self.day, day_end))
+        await asyncio.sleep(0)
+        # ...when another worker commits a booking and we take the lease
+        upstream.events.append(Event(
+            name="Committed elsewhere", start_time=self.day + timedelta(hours=12),
+            end_time=self.day + timedelta(hours=13), location="Library", event_id="evt_2"
+        ))
+        fresh = await client.refresh_schedule(self.day, day_end)
+        self.assertEqual(sorted(event.event_id for event in fresh), ["evt_1", "evt_2"])
+        await earlier
+        self.assertEqual(upstream.get_calls, 2)
+        # The earlier fetch finished last but doesn't replace the fresher copy
+        cached = await client.get_events(self.day, day_end)
+        self.assertEqual(sorted(event.event_id for event in cached), ["evt_1", "evt_2"])
+
+class TestEventRoute(AppTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        # Put a real client against the fake Luma under the tenant's cache
+        config = Config()
+        config.API_KEY = "test-key"
+        config.BASE_URL = "http://fake-luma"
+        self.fake = FakeLuma(api_key="test-key")
+        luma = LumaClient(config, transport=httpx.ASGITransport(app=self.fake.app))
+        self.addAsyncCleanup(luma.aclose)
+        self.tenant.luma_client.client = luma
+
+    async def test_unchanged_event_revalidates_without_asking_luma(self):
+        start = datetime.now(timezone.utc).replace(hour=18, minute=0, second=0, microsecond=0) + timedelta(days=3)
+        created = await self.client.post("/events/create", json={
+            "name": "Poll me", "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=1)).isoformat(),
+            "location": "Library", "host_email": "host@example.com"
+        })
+        self.assertEqual(created.status_code, 200, created.text)
+        event_id = created.json()["event_id"]
+
+        first = await self.client.get(f"/events/{event_id}")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()["name"], "Poll me")
+        self.assertEqual(first.headers["cache-control"], "private, no-cache")
+        etag = first.headers["etag"]
+        calls = self.fake.calls["event/get"]
+        self.assertEqual(calls, 1)
+
+        again = await self.client.get(f"/events/{event_id}", headers={"If-None-Match": etag})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+        self.assertEqual(again.headers["etag"], etag)
+        self.assertEqual(self.fake.calls["event/get"], calls)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import sqlite3
+import unittest
+from datetime import datetime, timedelta, timezone
+from models.event import Event
+from services.event_store import SQLiteEventStore, generate_synthetic_events
+from services.room_registry import load_room_registry
+
+DAY = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+def at(hour):
+    return DAY + timedelta(hours=hour)
+
+def make_event(event_id, start, end, location="Library"):
+    return Event(name=event_id, start_time=start, end_time=end, location=location, event_id=event_id)
+
+class TestSQLiteEventStore(unittest.TestCase):
+    def setUp(self):
+        self.store = SQLiteEventStore()
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_query_finds_events_that_started_before_the_range(self):
+        self.store.add_many([
+            make_event("long", at(6), at(12)),
+            make_event("early", at(7), at(8)),
+            make_event("other_room", at(9), at(10), location="Workshop"),
+        ])
+        found = self.store.query(at(9), at(10), locations=["Library"])
+        self.assertEqual([event.event_id for event in found], ["long"])
+
+    def test_replace_range_drops_events_missing_upstream(self):
+        self.store.add_many([make_event("kept", at(9), at(10)), make_event("gone", at(11), at(12))])
+        self.store.replace_range(DAY, DAY + timedelta(days=1), [make_event("kept", at(9), at(10))])
+        self.assertEqual(len(self.store), 1)
+        self.assertIsNone(self.store.get("gone"))
+
+    def test_failed_replace_range_leaves_the_window_intact(self):
+        self.store.add_many([make_event("kept", at(9), at(10))])
+        broken = Event(name=None, start_time=at(11), end_time=at(12), location="Library", event_id="broken")
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.store.replace_range(DAY, DAY + timedelta(days=1), [broken])
+        self.assertIsNotNone(self.store.get("kept"))
+
+    def test_bulk_load_round_trips(self):
+        events = generate_synthetic_events(load_room_registry(), 2000, DAY, 30, seed=1)
+        self.assertEqual(self.store.add_many(events), 2000)
+        stored = self.store.get(events[0].event_id)
+        self.assertEqual(stored.start_time, events[0].start_time)
+        self.assertEqual(stored.location, events[0].location)
+        in_range = self.store.query(DAY, DAY + timedelta(days=30))
+        self.assertEqual(len(in_range), 2000)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+from unittest import mock
+from fastapi import HTTPException
+from config import Config
+from services.idempotency import IdempotencyKeyReused, IdempotencyStore
+from services.singleflight import SingleFlight
+
+class TestIdempotencyStore(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.config = Config()
+        self.config.IDEMPOTENCY_TTL_SECONDS = 60
+        self.config.IDEMPOTENCY_MAX_KEYS = 100
+        self.store = IdempotencyStore(self.config)
+        self.calls = 0
+
+    async def create(self, result="evt-1", delay=0, error=None):
+        self.calls += 1
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return {"event_id": result}
+
+    async def test_repeated_key_replays_the_first_outcome(self):
+        first = await self.store.run("k", "body", lambda: self.create("evt-1"))
+        second = await self.store.run("k", "body", lambda: self.create("evt-2"))
+        self.assertEqual(first, ({"event_id": "evt-1"}, False))
+        self.assertEqual(second, ({"event_id": "evt-1"}, True))
+        self.assertEqual(self.calls, 1)
+
+    async def test_reused_key_with_a_different_body_is_refused(self):
+        await self.store.run("k", "body", self.create)
+        with self.assertRaises(IdempotencyKeyReused):
+            await self.store.run("k", "other body", self.create)
+        self.assertEqual(self.calls, 1)
+
+    async def test_concurrent_duplicates_share_one_call(self):
+        outcomes = await asyncio.gather(*(
+            self.store.run("k", "body", lambda: self.create(delay=0.01)) for _ in range(5)
+        ))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(sorted(replayed for _, replayed in outcomes), [False] + [True] * 4)
+        self.assertEqual(self.store.replays, 4)
+
+    async def test_client_errors_are_replayed_server_errors_are_retried(self):
+        for _ in range(2):
+            with self.assertRaises(HTTPException):
+                await self.store.run("conflict", "body", lambda: self.create(error=HTTPException(409)))
+        self.assertEqual(self.calls, 1)
+
+        with self.assertRaises(RuntimeError):
+            await self.store.run("flaky", "body", lambda: self.create(error=RuntimeError("luma down")))
+        result, replayed = await self.store.run("flaky", "body", self.create)
+        self.assertEqual((result, replayed), ({"event_id": "evt-1"}, False))
+        self.assertEqual(self.calls, 3)
+
+    async def test_outcomes_expire(self):
+        with mock.patch("services.idempotency.time.monotonic", return_value=1000.0):
+            await self.store.run("k", "body", self.create)
+        with mock.patch("services.idempotency.time.monotonic", return_value=1000.0 + 61):
+            _, replayed = await self.store.run("k", "other body", self.create)
+        self.assertFalse(replayed)
+        self.assertEqual(self.calls, 2)
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_callers_share_a_call_until_it_finishes(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(flight.do("day", fetch) for _ in range(4)))
+        self.assertEqual(results, [1, 1, 1, 1])
+        self.assertEqual(flight.shared, 3)
+        self.assertEqual(await flight.do("day", fetch), 2)
+
+    async def test_a_cancelled_caller_does_not_cancel_the_others(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "events"
+
+        impatient = asyncio.create_task(flight.do("day", fetch))
+        patient = asyncio.create_task(flight.do("day", fetch))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        self.assertEqual(await patient, "events")
+
+    async def test_errors_reach_every_caller(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream")
+
+        outcomes = await asyncio.gather(*(flight.do("day", fetch) for _ in range(2)), return_exceptions=True)
+        self.assertTrue(all(isinstance(outcome, ValueError) for outcome in outcomes))
+
+if __name__ == '__main__':
+    unittest.main()
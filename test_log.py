@@ -0,0 +1,58 @@
+import io
+import json
+import logging
+import unittest
+from config import Config
+from services.log import REDACTED, JsonFormatter, RedactingFilter, get_logger, log_fields
+from services.tenants import Tenant
+
+class TestRedaction(unittest.TestCase):
+    def setUp(self):
+        self.output = io.StringIO()
+        self.handler = logging.StreamHandler(self.output)
+        self.handler.setFormatter(JsonFormatter())
+        self.handler.addFilter(RedactingFilter(secrets=["default-key", None]))
+        self.logger = get_logger("test_redaction")
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+
+    def entries(self):
+        return [json.loads(line) for line in self.output.getvalue().splitlines()]
+
+    def test_sensitive_fields_are_redacted(self):
+        log_fields(
+            self.logger, logging.INFO, "calling luma",
+            headers={"x-luma-api-key": "abc"}, Authorization="Bearer abc", api_key="abc", status=200
+        )
+        [entry] = self.entries()
+        self.assertEqual(entry["headers"], REDACTED)
+        self.assertEqual(entry["Authorization"], REDACTED)
+        self.assertEqual(entry["api_key"], REDACTED)
+        self.assertEqual(entry["status"], 200)
+
+    def test_configured_secret_is_scrubbed_from_messages_and_fields(self):
+        self.logger.warning("request with %s failed", "default-key")
+        log_fields(self.logger, logging.WARNING, "upstream error", error="bad key default-key")
+        first, second = self.entries()
+        self.assertEqual(first["msg"], f"request with {REDACTED} failed")
+        self.assertEqual(second["error"], f"bad key {REDACTED}")
+
+    def test_tenant_keys_are_registered_when_the_tenant_is_built(self):
+        config = Config()
+        config.DEBUG_MODE = True
+        config.CALENDAR_SYNC_ENABLED = False
+        config.LOCAL_EVENT_STORE_PATH = ":memory:"
+        config.ROOM_LOCK_BACKEND = "memory"
+        config.API_KEY = "annex-tenant-key"
+        self.logger.info("key is annex-tenant-key")
+        Tenant("annex", config)
+        self.logger.info("key is annex-tenant-key")
+        before, after = self.entries()
+        self.assertEqual(before["msg"], "key is annex-tenant-key")
+        self.assertEqual(after["msg"], f"key is {REDACTED}")
+
+if __name__ == '__main__':
+    unittest.main()
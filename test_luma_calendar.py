@@ -1,4 +1,5 @@
 import unittest
+import asyncio
 from datetime import datetime, timedelta
 import pytz
 import os
@@ -51,7 +52,7 @@ class TestLumaCalendar(unittest.TestCase):
         
         try:
             # Create the event
-            event_id = self.luma_client.create_event(test_event)
+            event_id = asyncio.run(self.luma_client.create_event(test_event))
             self.assertIsNotNone(event_id)
             print(f"Successfully created event with ID: {event_id}")
             
@@ -0,0 +1,63 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from app_testing import AppTestCase
+from services import metrics
+from services.metrics import MetricsRegistry
+
+class TestExposition(unittest.TestCase):
+    def test_counter_labels_are_sorted_and_escaped(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("things_total", "Things seen")
+        counter.inc(room='say "hi"', kind="a")
+        counter.inc(2, room='say "hi"', kind="a")
+        self.assertEqual(registry.render(), (
+            "# HELP things_total Things seen\n"
+            "# TYPE things_total counter\n"
+            'things_total{kind="a",room="say \\"hi\\""} 3\n'
+        ))
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("wait_seconds", "Waits", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, route="/x")
+        lines = registry.render().splitlines()
+        self.assertEqual(lines[1], "# TYPE wait_seconds histogram")
+        self.assertEqual(lines[2:], [
+            'wait_seconds_bucket{route="/x",le="0.1"} 1',
+            'wait_seconds_bucket{route="/x",le="1.0"} 2',
+            'wait_seconds_bucket{route="/x",le="+Inf"} 3',
+            'wait_seconds_sum{route="/x"} 5.55',
+            'wait_seconds_count{route="/x"} 3',
+        ])
+
+class TestMetricsRoute(AppTestCase):
+    async def book(self, location, day):
+        start = datetime.now(timezone.utc).replace(hour=18, minute=0, second=0, microsecond=0) + timedelta(days=day)
+        return await self.client.post("/events/create", json={
+            "name": "Metrics check", "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=1)).isoformat(),
+            "location": location, "host_email": "host@example.com"
+        })
+
+    async def test_bookings_are_labelled_by_room_id(self):
+        known = metrics.bookings.value(room="library")
+        unknown = metrics.bookings.value(room="unknown")
+        await self.book("Library", day=3)
+        for garbage in ("Nowhere 1", "Nowhere 2"):
+            await self.book(garbage, day=4)
+        self.assertEqual(metrics.bookings.value(room="library"), known + 1)
+        self.assertEqual(metrics.bookings.value(room="unknown"), unknown + 2)
+        self.assertEqual(metrics.bookings.value(room="Nowhere 1"), 0)
+
+        response = await self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        body = response.text
+        self.assertIn("# TYPE bookings_total counter", body)
+        self.assertIn('bookings_total{room="library"}', body)
+        self.assertNotIn("Nowhere", body)
+        self.assertIn('http_request_duration_seconds_count{method="POST",route="/events/create"', body)
+
+if __name__ == '__main__':
+    unittest.main()
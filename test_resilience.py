@@ -0,0 +1,135 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+import httpx
+from config import Config
+from fake_luma import FakeLuma
+from models.event import Event
+from services.luma_client import LumaClient
+from services.resilience import CircuitOpenError, RetryPolicy, parse_retry_after
+
+class TestLumaResilience(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.config = Config()
+        self.config.API_KEY = "test-key"
+        self.config.BASE_URL = "http://fake-luma"
+        self.config.LUMA_MAX_RETRIES = 2
+        self.config.LUMA_RETRY_BASE_SECONDS = 0
+        self.config.LUMA_BREAKER_THRESHOLD = 2
+        self.config.LUMA_BREAKER_RESET_SECONDS = 60
+        self.fake = FakeLuma(api_key="test-key")
+        self.fake.add_event("Yoga", "2025-03-01T17:00:00Z", "2025-03-01T18:00:00Z", "North Studio", api_id="evt-yoga")
+        self.client = LumaClient(self.config, transport=httpx.ASGITransport(app=self.fake.app))
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def test_transient_errors_are_retried(self):
+        self.fake.fail_next("event/get", 503, times=2)
+        event = await self.client.get_event("evt-yoga")
+        self.assertEqual(event.location, "North Studio")
+        self.assertEqual(self.fake.calls["event/get"], 3)
+        self.assertEqual(self.client.breaker.status()["state"], "closed")
+
+    async def test_retry_after_beyond_max_delay_is_not_waited_out(self):
+        self.fake.fail_next("event/get", 429, retry_after="120")
+        with self.assertRaises(httpx.HTTPStatusError):
+            await self.client.get_event("evt-yoga")
+        self.assertEqual(self.fake.calls["event/get"], 1)
+
+    async def test_event_creation_is_not_retried_on_server_errors(self):
+        self.fake.fail_next("event/create", 500)
+        new_event = Event(
+            name="Salsa",
+            start_time=datetime(2025, 3, 1, 19, tzinfo=timezone.utc),
+            end_time=datetime(2025, 3, 1, 20, tzinfo=timezone.utc),
+            location="South Studio"
+        )
+        with self.assertRaises(httpx.HTTPStatusError):
+            await self.client.create_event(new_event)
+        self.assertEqual(self.fake.calls["event/create"], 1)
+
+    async def test_refused_primary_host_is_reported_not_raised(self):
+        self.fake.fail_next("event/add-host", 400)
+        new_event = Event(
+            name="Salsa",
+            start_time=datetime(2025, 3, 1, 19, tzinfo=timezone.utc),
+            end_time=datetime(2025, 3, 1, 20, tzinfo=timezone.utc),
+            location="South Studio",
+            host_email="lead@example.com",
+            additional_hosts=["co@example.com"]
+        )
+        event_id = await self.client.create_event(new_event)
+        self.assertIn(event_id, self.fake.events)
+        statuses = {host["email"]: host["status"] for host in new_event.host_results}
+        self.assertEqual(sorted(statuses.values()), ["added", "failed"])
+
+    async def test_circuit_opens_and_fails_fast(self):
+        self.fake.fail_next("event/get", 503, times=6)
+        for _ in range(2):
+            with self.assertRaises(httpx.HTTPStatusError):
+                await self.client.get_event("evt-yoga")
+        self.assertEqual(self.client.breaker.status()["state"], "open")
+
+        calls_before = self.fake.calls["event/get"]
+        with self.assertRaises(CircuitOpenError):
+            await self.client.get_event("evt-yoga")
+        self.assertEqual(self.fake.calls["event/get"], calls_before)
+
+    async def test_half_open_probe_closes_the_circuit(self):
+        self.config.LUMA_BREAKER_RESET_SECONDS = 0
+        client = LumaClient(self.config, transport=httpx.ASGITransport(app=self.fake.app))
+        self.fake.fail_next("event/get", 503, times=6)
+        for _ in range(2):
+            with self.assertRaises(httpx.HTTPStatusError):
+                await client.get_event("evt-yoga")
+        event = await client.get_event("evt-yoga")
+        self.assertEqual(event.event_id, "evt-yoga")
+        self.assertEqual(client.breaker.status()["state"], "closed")
+        await client.aclose()
+
+class TestEventPaging(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        config = Config()
+        config.API_KEY = "test-key"
+        config.BASE_URL = "http://fake-luma"
+        self.fake = FakeLuma(page_size=1, api_key="test-key")
+        for hour in (17, 18, 19):
+            self.fake.add_event(f"Talk {hour}", f"2025-03-01T{hour}:00:00Z", f"2025-03-01T{hour}:30:00Z", "Library")
+        self.client = LumaClient(config, transport=httpx.ASGITransport(app=self.fake.app))
+        self.day = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def test_pages_are_fetched_as_they_are_used(self):
+        names = [event.name async for event in self.client.iter_events(self.day, self.day + timedelta(days=1))]
+        self.assertEqual(names, ["Talk 17", "Talk 18", "Talk 19"])
+        self.assertEqual(self.fake.calls["calendar/list-events"], 3)
+
+    async def test_stopping_early_skips_later_pages(self):
+        events = self.client.iter_events(self.day, self.day + timedelta(days=1))
+        async for event in events:
+            self.assertEqual(event.name, "Talk 17")
+            break
+        await events.aclose()
+        self.assertEqual(self.fake.calls["calendar/list-events"], 1)
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_backoff_is_bounded_and_gives_up(self):
+        config = Config()
+        config.LUMA_MAX_RETRIES = 3
+        config.LUMA_RETRY_BASE_SECONDS = 1
+        config.LUMA_RETRY_MAX_SECONDS = 2
+        policy = RetryPolicy(config)
+        for attempt in range(3):
+            self.assertLessEqual(policy.delay(attempt), 2)
+        self.assertIsNone(policy.delay(3))
+        self.assertEqual(policy.delay(0, retry_after=1.5), 1.5)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+
+if __name__ == '__main__':
+    unittest.main()
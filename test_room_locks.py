@@ -0,0 +1,90 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from config import Config
+from services.conflict_checker import ConflictChecker
+from services.room_locks import RoomLockManager, RoomLockTimeout
+
+class RoomLockTests:
+    """Shared checks run against each lock backend"""
+
+    backend = None
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = Config()
+        self.config.ROOM_LOCK_BACKEND = self.backend
+        self.config.ROOM_LOCK_PATH = os.path.join(self.tmp.name, "locks.db")
+        self.config.ROOM_LOCK_TIMEOUT_SECONDS = 0.3
+        self.locks = RoomLockManager(self.config, ConflictChecker(self.config))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_conflicting_rooms_are_serialized(self):
+        order = []
+
+        async def book(room, label):
+            async with self.locks.hold([room]):
+                order.append(f"{label} start")
+                await asyncio.sleep(0.05)
+                order.append(f"{label} end")
+
+        await asyncio.gather(book("Full Studio", "full"), book("North Studio", "north"))
+        self.assertIn(order, (
+            ["full start", "full end", "north start", "north end"],
+            ["north start", "north end", "full start", "full end"],
+        ))
+
+    async def test_unrelated_rooms_run_in_parallel(self):
+        inside = asyncio.Event()
+
+        async def hold_library():
+            async with self.locks.hold(["Library"]):
+                inside.set()
+                await asyncio.sleep(0.1)
+
+        task = asyncio.create_task(hold_library())
+        await inside.wait()
+        async with self.locks.hold(["Hogwarts Hall"]):
+            self.assertFalse(task.done())
+        await task
+
+    async def test_waiting_too_long_times_out(self):
+        async with self.locks.hold(["Library"]):
+            with self.assertRaises(RoomLockTimeout):
+                async with self.locks.hold(["Library"]):
+                    pass
+        async with self.locks.hold(["Library"]):
+            pass
+
+class TestInProcessRoomLocks(RoomLockTests, unittest.IsolatedAsyncioTestCase):
+    backend = "memory"
+
+class TestSQLiteRoomLocks(RoomLockTests, unittest.IsolatedAsyncioTestCase):
+    backend = "sqlite"
+
+    async def test_leases_are_renewed_while_held(self):
+        self.config.ROOM_LOCK_LEASE_SECONDS = 0.15
+        self.config.ROOM_LOCK_TIMEOUT_SECONDS = 1
+        # A second manager stands in for another worker sharing the lease file
+        locks = RoomLockManager(self.config, ConflictChecker(self.config))
+        other_worker = RoomLockManager(self.config, ConflictChecker(self.config))
+        order = []
+
+        async def slow_booking():
+            async with locks.hold(["Library"]):
+                order.append("slow start")
+                await asyncio.sleep(0.5)
+                order.append("slow end")
+
+        task = asyncio.create_task(slow_booking())
+        await asyncio.sleep(0.05)
+        async with other_worker.hold(["Library"]):
+            order.append("other")
+        await task
+        self.assertEqual(order, ["slow start", "slow end", "other"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import unittest
+from app_testing import AppTestCase
+from services.room_registry import DEFAULT_ROOMS_PATH, load_room_registry, read_room_registry
+
+class TestRoomRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "rooms.json")
+        with open(self.path, "w") as f:
+            json.dump({"buildings": {
+                "1": {"address": "1 Main St, San Francisco", "rooms": [
+                    {"id": "hall", "name": "Great Hall", "description": "up to 40 people", "conflicts_with": ["Hall Nook"]},
+                    {"id": "nook", "name": "Hall Nook", "description": "cozy", "capacity": 4},
+                ]},
+                "2": {"address": "2 Side St, San Francisco", "rooms": [
+                    {"id": "attic", "name": "Attic", "description": "up to 6 people"},
+                ]},
+            }, "coordinates": {"latitude": "37.7", "longitude": "-122.4"}}, f)
+        self.registry = read_room_registry(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rooms_are_loaded_with_building_details(self):
+        self.assertEqual([room.id for room in self.registry.rooms], ["hall", "nook", "attic"])
+        attic = self.registry.by_id["attic"]
+        self.assertEqual((attic.building, attic.address), ("2", "2 Side St, San Francisco"))
+        self.assertEqual(self.registry.by_name["Great Hall"].capacity, 40)
+        self.assertEqual(self.registry.by_name["Hall Nook"].capacity, 4)
+        self.assertEqual(self.registry.coordinates["latitude"], "37.7")
+
+    def test_lookups(self):
+        self.assertIs(self.registry.lookup("nook"), self.registry.lookup("Hall Nook"))
+        self.assertIsNone(self.registry.lookup("Basement"))
+        self.assertEqual(self.registry.conflicts_for("Hall Nook"), {"Great Hall"})
+        self.assertEqual(self.registry.find_room_in("Potluck in the Great Hall"), "Great Hall")
+        self.assertIsNone(self.registry.find_room_in("Potluck"))
+
+    def test_locations_body_lists_every_room(self):
+        body = json.loads(self.registry.locations_body)
+        self.assertEqual(body[0], {"id": "hall", "name": "Great Hall", "description": "up to 40 people", "building": "1"})
+        self.assertEqual(len(body), 3)
+
+    def test_load_is_cached_per_path(self):
+        self.assertIs(load_room_registry(DEFAULT_ROOMS_PATH), load_room_registry(DEFAULT_ROOMS_PATH))
+        self.assertIsNot(read_room_registry(self.path), self.registry)
+
+class TestLocationsRoute(AppTestCase):
+    async def test_locations_revalidate_with_etag(self):
+        response = await self.client.get("/locations")
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["etag"]
+        self.assertEqual(response.headers["cache-control"], "no-cache")
+        self.assertIn("Full Studio", {room["name"] for room in response.json()})
+
+        for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            response = await self.client.get("/locations", headers={"If-None-Match": header})
+            self.assertEqual(response.status_code, 304, header)
+            self.assertEqual(response.content, b"")
+            self.assertEqual(response.headers["etag"], etag)
+
+        response = await self.client.get("/locations", headers={"If-None-Match": '"stale"'})
+        self.assertEqual(response.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import json
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from app_testing import AppTestCase
+from models.event import Event
+from models.event_columns import EventColumns
+from services import schedule_feed
+from services.room_registry import RoomRegistry
+from services.schedule_feed import _ics_fold, ics_chunks, jsonl_chunks, room_events
+
+START = datetime(2026, 3, 2, tzinfo=timezone.utc)
+
+def _registry():
+    return RoomRegistry({"buildings": {"1": {"address": "1 Main St", "rooms": [
+        {"id": "hall", "name": "Hall", "description": "up to 40 people", "conflicts_with": ["Nook"]},
+        {"id": "nook", "name": "Nook", "description": "up to 4 people", "conflicts_with": ["Hall"]},
+        {"id": "attic", "name": "Attic", "description": "up to 6 people"},
+    ]}}, "coordinates": {"latitude": "37.7", "longitude": "-122.4"}})
+
+def _event(name, hours, location, event_id=None):
+    start = START + timedelta(hours=hours)
+    return Event(name=name, start_time=start, end_time=start + timedelta(hours=1),
+                 location=location, event_id=event_id, url=f"https://lu.ma/{event_id}" if event_id else None)
+
+EVENTS = [
+    _event("Standup", 1, "Hall", "evt-1"),
+    _event("Reading, quietly; together", 2, "Nook", "evt-2"),
+    _event("Elsewhere", 3, "Attic", "evt-3"),
+]
+
+class _FakeSync:
+    def __init__(self, mirrored):
+        self.mirrored = mirrored
+
+    def covers(self, start, end):
+        return self.mirrored
+
+    async def get_schedule(self, start, end):
+        return EventColumns.from_events(EVENTS)
+
+class _FakeLuma:
+    def __init__(self):
+        self.calls = 0
+
+    async def iter_events(self, start, end):
+        self.calls += 1
+        for event in EVENTS:
+            yield event
+
+def _tenant(mirrored):
+    return SimpleNamespace(room_registry=_registry(), calendar_sync=_FakeSync(mirrored), luma_client=_FakeLuma())
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+class TestScheduleFeed(unittest.IsolatedAsyncioTestCase):
+    async def test_mirror_and_luma_agree_and_include_conflicting_rooms(self):
+        room = _registry().lookup("hall")
+        end = START + timedelta(days=1)
+        mirrored = [event.name async for event in room_events(_tenant(True), room, START, end)]
+        tenant = _tenant(False)
+        paged = [event.name async for event in room_events(tenant, room, START, end)]
+        self.assertEqual(mirrored, ["Standup", "Reading, quietly; together"])
+        self.assertEqual(paged, mirrored)
+        self.assertEqual(tenant.luma_client.calls, 1)
+        alone = [event.name async for event in room_events(_tenant(True), room, START, end, include_conflicts=False)]
+        self.assertEqual(alone, ["Standup"])
+
+    async def test_ics_escapes_flags_blocked_and_closes_calendar(self):
+        room = _registry().lookup("hall")
+        body = b"".join(await _collect(ics_chunks(room_events(_tenant(True), room, START, START + timedelta(days=1)), room)))
+        text = body.decode()
+        self.assertTrue(text.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(text.endswith("END:VCALENDAR\r\n"))
+        self.assertEqual(text.count("BEGIN:VEVENT"), 2)
+        self.assertIn("SUMMARY:Reading\\, quietly\\; together\r\n", text)
+        self.assertIn("X-BLOCKED-BY-ROOM:Nook\r\n", text)
+        self.assertIn("DTSTART:20260302T010000Z\r\n", text)
+
+    def test_long_lines_fold_at_75_octets_without_splitting_characters(self):
+        folded = _ics_fold("SUMMARY:" + "é" * 100)
+        lines = folded.encode().split(b"\r\n")
+        self.assertTrue(all(len(line) <= 75 for line in lines))
+        self.assertEqual(folded.replace("\r\n ", ""), "SUMMARY:" + "é" * 100 + "\r\n")
+
+    async def test_jsonl_is_written_in_chunks(self):
+        room = _registry().lookup("attic")
+        many = [_event(f"Talk {i}", i, "Attic", f"evt-{i}") for i in range(7)]
+
+        async def events():
+            for event in many:
+                yield event
+
+        original = schedule_feed.CHUNK_EVENTS
+        schedule_feed.CHUNK_EVENTS = 3
+        try:
+            chunks = await _collect(jsonl_chunks(events(), room))
+        finally:
+            schedule_feed.CHUNK_EVENTS = original
+        self.assertEqual(len(chunks), 3)
+        rows = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+        self.assertEqual([row["name"] for row in rows], [event.name for event in many])
+        self.assertFalse(rows[0]["blocked_by_other_room"])
+
+class TestScheduleRoute(AppTestCase):
+    mirrored = False
+
+    async def test_naive_range_is_read_as_local_time(self):
+        tomorrow = date.today() + timedelta(days=1)
+        params = {"start": f"{tomorrow}T09:00:00", "end": f"{tomorrow}T17:00:00"}
+        for fmt in ("ics", "jsonl"):
+            response = await self.client.get(f"/rooms/library/schedule.{fmt}", params=params)
+            self.assertEqual(response.status_code, 200, f"{fmt}: {response.text}")
+            # Only mirror answers carry validators, and that path compares against its aware window
+            self.assertEqual("etag" in response.headers, self.mirrored)
+
+class TestScheduleRouteSynced(TestScheduleRoute):
+    config = {"CALENDAR_SYNC_ENABLED": True}
+    mirrored = True
+
+    async def get_feed(self, **headers):
+        return await self.client.get("/rooms/library/schedule.jsonl", headers=headers)
+
+    async def book_library(self):
+        start = datetime.now(timezone.utc).replace(hour=18, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        response = await self.client.post("/events/create", json={
+            "name": "Feed check", "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=1)).isoformat(),
+            "location": "Library", "host_email": "host@example.com"
+        })
+        self.assertEqual(response.status_code, 200, response.text)
+
+    async def test_if_none_match_gets_304_until_the_room_changes(self):
+        etag = (await self.get_feed()).headers["etag"]
+        self.assertTrue(etag.startswith("W/"))
+        self.assertEqual((await self.get_feed(**{"If-None-Match": etag})).status_code, 304)
+
+        await self.book_library()
+        changed = await self.get_feed(**{"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["etag"], etag)
+        self.assertIn("Feed check", changed.text)
+
+    async def test_if_modified_since_gets_304(self):
+        # HTTP dates have whole seconds, so let the last change be older than the booking below
+        sync = self.tenant.calendar_sync
+        sync.last_changed = (sync.last_changed or sync.last_sync) - timedelta(minutes=1)
+        last_modified = (await self.get_feed()).headers["last-modified"]
+        self.assertEqual((await self.get_feed(**{"If-Modified-Since": last_modified})).status_code, 304)
+        await self.book_library()
+        self.assertEqual((await self.get_feed(**{"If-Modified-Since": last_modified})).status_code, 200)
+
+    async def test_etag_follows_content_not_this_process(self):
+        etag = (await self.get_feed()).headers["etag"]
+        # A fresh worker's mirror starts counting from zero; the same events keep the same tag
+        self.tenant.calendar_sync.version = 0
+        self.assertEqual((await self.get_feed()).headers["etag"], etag)
+
+if __name__ == '__main__':
+    unittest.main()
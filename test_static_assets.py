@@ -0,0 +1,87 @@
+import gzip
+import os
+import tempfile
+import unittest
+import main
+from app_testing import AppTestCase
+from services.static_assets import IMMUTABLE, StaticAssets
+
+class TestStaticAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp.name, "images"))
+        files = {
+            "index.html": '<link href="/static/styles.css"><img src="/static/images/logo.png">',
+            "styles.css": "body { background: url(/static/images/logo.png); }" + " .a { color: red; }" * 50,
+            "images/logo.png": "\x89PNG not really",
+        }
+        for name, content in files.items():
+            with open(os.path.join(self.tmp.name, name), "w") as f:
+                f.write(content)
+        self.assets = StaticAssets(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_references_point_at_fingerprinted_names(self):
+        index = self.assets.index.bodies["identity"].decode()
+        self.assertIn(f'/static/{self.assets.manifest["styles.css"]}', index)
+        css = self.assets.get(self.assets.manifest["styles.css"]).bodies["identity"].decode()
+        self.assertIn(f'/static/{self.assets.manifest["images/logo.png"]}', css)
+        self.assertTrue(self.assets.is_immutable(self.assets.manifest["styles.css"]))
+        self.assertFalse(self.assets.is_immutable("styles.css"))
+
+    def test_text_is_precompressed_and_images_are_not(self):
+        css = self.assets.get("styles.css")
+        self.assertEqual(gzip.decompress(css.bodies["gzip"]), css.bodies["identity"])
+        self.assertEqual(list(self.assets.get("images/logo.png").bodies), ["identity"])
+
+    def test_encoding_negotiation(self):
+        css = self.assets.get("styles.css")
+        self.assertEqual(StaticAssets.negotiate(css, "gzip, deflate"), "gzip")
+        self.assertEqual(StaticAssets.negotiate(css, "gzip;q=0, deflate"), "identity")
+        self.assertEqual(StaticAssets.negotiate(css, None), "identity")
+        self.assertNotEqual(StaticAssets.etag(css, "gzip"), StaticAssets.etag(css, "identity"))
+
+class TestStaticRoutes(AppTestCase):
+    async def test_head_is_answered_like_get(self):
+        for path in ("/", "/static/styles.css"):
+            got = await self.client.get(path)
+            head = await self.client.head(path)
+            self.assertEqual(head.status_code, 200, path)
+            self.assertEqual(head.headers["etag"], got.headers["etag"])
+            self.assertEqual(head.headers["content-length"], got.headers["content-length"])
+        missing = await self.client.head("/static/nope.css")
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_gzip_is_served_to_clients_that_accept_it(self):
+        plain = await self.client.get("/static/styles.css", headers={"Accept-Encoding": "identity"})
+        zipped = await self.client.get("/static/styles.css", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("content-encoding", plain.headers)
+        self.assertEqual(zipped.headers["content-encoding"], "gzip")
+        self.assertEqual(zipped.headers["vary"], "Accept-Encoding")
+        self.assertLess(int(zipped.headers["content-length"]), int(plain.headers["content-length"]))
+        self.assertEqual(zipped.text, plain.text)
+        self.assertNotEqual(zipped.headers["etag"], plain.headers["etag"])
+
+    async def test_only_hashed_names_are_immutable(self):
+        hashed = main.static_assets.manifest["styles.css"]
+        index = await self.client.get("/")
+        self.assertEqual(index.headers["cache-control"], "no-cache")
+        self.assertIn(f"/static/{hashed}", index.text)
+        self.assertEqual((await self.client.get(f"/static/{hashed}")).headers["cache-control"], IMMUTABLE)
+        self.assertEqual((await self.client.get("/static/styles.css")).headers["cache-control"], "no-cache")
+
+    async def test_if_none_match_gets_304_in_any_encoding(self):
+        zipped = await self.client.get("/static/styles.css", headers={"Accept-Encoding": "gzip"})
+        for accept in ("gzip", "identity"):
+            again = await self.client.get("/static/styles.css", headers={
+                "Accept-Encoding": accept, "If-None-Match": zipped.headers["etag"]
+            })
+            self.assertEqual(again.status_code, 304, accept)
+            self.assertEqual(again.content, b"")
+        index = await self.client.get("/")
+        self.assertEqual((await self.client.get("/", headers={"If-None-Match": index.headers["etag"]})).status_code, 304)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+import sqlite3
+import unittest
+from unittest import mock
+from config import Config
+from services.tenants import TenantPool, UnknownTenant, load_tenant_configs
+
+class TestTenantPool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = Config()
+        self.config.DEBUG_MODE = True
+        self.config.CALENDAR_SYNC_ENABLED = False
+        self.config.LOCAL_EVENT_STORE_PATH = ":memory:"
+        self.config.ROOM_LOCK_PATH = os.path.join(self.tmp.name, "room_locks.db")
+        self.config.TENANTS_CONFIG_PATH = os.path.join(self.tmp.name, "tenants.json")
+        with open(os.path.join(self.tmp.name, "rooms_annex.json"), "w") as f:
+            json.dump({"buildings": {"1": {"address": "1 Main St, San Francisco", "rooms": [
+                {"id": "attic", "name": "Attic", "description": "up to 4 people"}
+            ]}}, "coordinates": {"latitude": "37.7", "longitude": "-122.4"}}, f)
+        with open(self.config.TENANTS_CONFIG_PATH, "w") as f:
+            json.dump({"annex": {"rooms": "rooms_annex.json", "api_key_env": "ANNEX_LUMA_KEY"}}, f)
+        self.pool = TenantPool(self.config)
+
+    async def asyncTearDown(self):
+        await self.pool.aclose()
+        self.tmp.cleanup()
+
+    def test_tenants_json_overrides_rooms_key_and_paths(self):
+        with mock.patch.dict(os.environ, {"ANNEX_LUMA_KEY": "annex-key"}):
+            configs = load_tenant_configs(self.config)
+        self.assertEqual(sorted(configs), ["annex", "default"])
+        self.assertEqual(configs["annex"].API_KEY, "annex-key")
+        self.assertTrue(configs["annex"].ROOM_LOCK_PATH.endswith("room_locks_annex.db"))
+        self.assertIs(configs["default"], self.config)
+
+    async def test_tenants_are_built_lazily_with_their_own_rooms(self):
+        self.assertEqual(self.pool.status()["active"], {})
+        annex = self.pool.get("annex")
+        self.assertEqual([room.name for room in annex.room_registry.rooms], ["Attic"])
+        self.assertIs(self.pool.get("annex"), annex)
+        self.assertIsNot(self.pool.get().luma_client, annex.luma_client)
+
+    async def test_unknown_tenant_is_refused(self):
+        with self.assertRaises(UnknownTenant):
+            self.pool.get("nope")
+
+    async def test_idle_tenants_are_evicted_unless_in_use(self):
+        self.pool.idle_seconds = 0
+        annex = self.pool.get("annex")
+        async with self.pool.use():
+            await self.pool.evict_idle()
+            self.assertEqual(list(self.pool.status()["active"]), ["default"])
+        await self.pool.evict_idle()
+        self.assertEqual(self.pool.status()["active"], {})
+        self.assertEqual(self.pool.evictions, 2)
+        self.assertIsNot(self.pool.get("annex"), annex)
+
+    async def test_evicted_tenants_close_their_stores(self):
+        self.config.SYNC_STORE_PATH = os.path.join(self.tmp.name, "sync.db")
+        self.pool = TenantPool(self.config)
+        self.pool.idle_seconds = 0
+        annex = self.pool.get("annex")
+        stores = [annex.luma_client.client.store, annex.calendar_sync.store]
+        await self.pool.evict_idle()
+        for store in stores:
+            with self.assertRaises(sqlite3.ProgrammingError):
+                len(store)
+
+if __name__ == '__main__':
+    unittest.main()